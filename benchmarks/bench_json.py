@@ -0,0 +1,59 @@
+"""
+Compares the JSON backends on a large synthetic manifest.
+
+Usage:
+    python benchmarks/bench_json.py [--models 5000] [--repeat 5]
+
+The manifest is built by replicating the models of tests/manifest.json.
+"""
+
+import argparse
+import copy
+import json
+import os
+import time
+
+from cube_dbt import jsonlib
+
+TEST_MANIFEST = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "..", "tests", "manifest.json"
+)
+
+
+def build_manifest(models: int) -> bytes:
+    with open(TEST_MANIFEST, "rb") as file:
+        manifest = json.loads(file.read())
+
+    templates = list(
+        node for node in manifest["nodes"].values() if node["resource_type"] == "model"
+    )
+    nodes = {}
+    for index in range(models):
+        node = copy.deepcopy(templates[index % len(templates)])
+        node["name"] = f"{node['name']}_{index}"
+        node["unique_id"] = f"model.jaffle_shop.{node['name']}"
+        nodes[node["unique_id"]] = node
+    manifest["nodes"] = nodes
+    return json.dumps(manifest).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--models", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = build_manifest(args.models)
+    print(f"Manifest with {args.models} models, {len(data) / 1e6:.1f} MB")
+
+    for backend in jsonlib.available_backends():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            jsonlib.loads(data, backend=backend)
+            timings.append(time.perf_counter() - start)
+        print(f"  {backend:<10}{min(timings) * 1000:>10.1f} ms (best of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
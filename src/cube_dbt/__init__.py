@@ -1,3 +1,24 @@
-from .column import Column
-from .dbt import Dbt
-from .model import Model
\ No newline at end of file
+# Submodules and their dependencies (PyYAML, urllib, json) are imported on
+# first attribute access, so importing cube_dbt stays cheap in workers that
+# never render.
+_LAZY_ATTRIBUTES = {
+    "Column": "cube_dbt.column",
+    "Dbt": "cube_dbt.dbt",
+    "Model": "cube_dbt.model",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'cube_dbt' has no attribute '{name}'")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
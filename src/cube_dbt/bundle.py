@@ -0,0 +1,176 @@
+"""
+Single-file bundles of generated cube templates.
+
+Instead of one small file per model, all templates are written into one zip or
+tar archive, or one multi-document YAML file, in a single pass. Entries are
+stored uncompressed, and an index of their byte offsets is written next to the
+bundle, so a single template can be read with one seek without unpacking the
+rest.
+"""
+
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+BUNDLE_FORMATS = ("zip", "tar", "yaml")
+
+_EXTENSIONS = {
+    ".zip": "zip",
+    ".tar": "tar",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+}
+
+_ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def bundle_format(path: str) -> str:
+    """
+    Returns the bundle format of a path from its extension.
+
+    Raises:
+        ValueError: If the extension is not one of .zip, .tar, .yml or .yaml.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(
+            f"Unknown bundle extension for {path}, expected one of {', '.join(_EXTENSIONS)}"
+        )
+    return _EXTENSIONS[extension]
+
+
+def index_path(path: str) -> str:
+    return f"{path}.index.json"
+
+
+class BundleWriter:
+    """
+    Writes templates into a bundle one by one, and its index when closed.
+
+    For use as a context manager:
+
+        with BundleWriter("cubes.zip") as bundle:
+            bundle.add("orders.yml.jinja", template)
+    """
+
+    def __init__(self, path: str, format: str = None) -> None:
+        self.path = path
+        self.format = format or bundle_format(path)
+        if self.format not in BUNDLE_FORMATS:
+            raise ValueError(
+                f"Unknown bundle format: {self.format}, expected one of {', '.join(BUNDLE_FORMATS)}"
+            )
+        self.entries = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.format == "zip":
+            self._archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+        elif self.format == "tar":
+            self._archive = tarfile.open(path, "w")
+        else:
+            self._archive = open(path, "wb")
+
+    def __enter__(self) -> "BundleWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, name: str, content: str) -> None:
+        data = content.encode("utf-8")
+        if name in self.entries:
+            raise ValueError(f"Duplicate bundle entry: {name}")
+
+        if self.format == "zip":
+            self._archive.writestr(name, data)
+            # The data offset is only known from the local header, read it in close()
+            offset = None
+        elif self.format == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            self._archive.addfile(info, io.BytesIO(data))
+            blocks = -(-len(data) // tarfile.BLOCKSIZE)
+            offset = self._archive.offset - blocks * tarfile.BLOCKSIZE
+        else:
+            if not data.endswith(b"\n"):
+                data += b"\n"
+            self._archive.write(f"--- # {name}\n".encode("utf-8"))
+            offset = self._archive.tell()
+            self._archive.write(data)
+        self.entries[name] = {"offset": offset, "size": len(data)}
+
+    def _zip_offsets(self) -> None:
+        infos = {info.filename: info for info in self._archive.infolist()}
+        with open(self.path, "rb") as f:
+            for name, entry in self.entries.items():
+                header_offset = infos[name].header_offset
+                f.seek(header_offset)
+                header = f.read(_ZIP_LOCAL_HEADER_SIZE)
+                name_length = int.from_bytes(header[26:28], "little")
+                extra_length = int.from_bytes(header[28:30], "little")
+                entry["offset"] = (
+                    header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length
+                )
+
+    def close(self) -> None:
+        if self._archive is None:
+            return
+        self._archive.close()
+        if self.format == "zip":
+            self._zip_offsets()
+        self._archive = None
+        with open(index_path(self.path), "w") as f:
+            json.dump({"format": self.format, "entries": self.entries}, f, indent=2)
+
+
+def read_index(path: str) -> dict:
+    with open(index_path(path), "r") as f:
+        return json.load(f)
+
+
+def read_entry(path: str, name: str, index: dict = None) -> str:
+    """
+    Reads a single template from a bundle using its index.
+
+    Args:
+        path (str): Path of the bundle.
+        name (str): Name of the template, e.g. 'orders.yml.jinja'.
+        index (dict, optional): The index of the bundle, read from <path>.index.json if not specified.
+
+    Raises:
+        KeyError: If the bundle has no such template.
+    """
+    if index is None:
+        index = read_index(path)
+    entry = index["entries"][name]
+    with open(path, "rb") as f:
+        f.seek(entry["offset"])
+        return f.read(entry["size"]).decode("utf-8")
+
+
+def extract(path: str, schema_path: str, names: list[str] = None) -> list[str]:
+    """
+    Extracts templates from a bundle into <schema_path>/cubes.
+
+    Args:
+        path (str): Path of the bundle.
+        schema_path (str): Cube schema directory.
+        names (list[str], optional): Only extract these templates instead of all of them.
+
+    Returns:
+        list[str]: Names of the extracted templates.
+    """
+    index = read_index(path)
+    if names is None:
+        names = list(index["entries"])
+    os.makedirs(f"{schema_path}/cubes", exist_ok=True)
+    with open(path, "rb") as bundle:
+        for name in names:
+            entry = index["entries"][name]
+            bundle.seek(entry["offset"])
+            with open(f"{schema_path}/cubes/{name}", "wb") as f:
+                f.write(bundle.read(entry["size"]))
+    return names
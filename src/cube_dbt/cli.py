@@ -0,0 +1,322 @@
+import argparse
+import sys
+import time
+
+from cube_dbt.dbt import Dbt
+from cube_dbt.generator import CubeGenerator
+from cube_dbt.recommend import QueryLogAnalyzer
+from cube_dbt.shard import merge_shards
+from cube_dbt.watch import ManifestWatcher
+
+
+def _is_url(manifest: str) -> bool:
+    return manifest.startswith(("http://", "https://"))
+
+
+def _load_dbt(args: argparse.Namespace) -> Dbt:
+    if _is_url(args.manifest):
+        dbt = Dbt.from_url(
+            args.manifest, run_results_url=args.run_results, catalog_url=args.catalog
+        )
+    else:
+        dbt = Dbt.from_file(
+            args.manifest,
+            encoding=args.encoding,
+            run_results_path=args.run_results,
+            catalog_path=args.catalog,
+        )
+    return dbt.filter(
+        paths=args.paths, tags=args.tags, names=args.names, select=args.select
+    )
+
+
+def _add_manifest_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("manifest", help="Path or URL of the dbt manifest.json")
+    parser.add_argument(
+        "--encoding",
+        default=None,
+        help="Encoding of local manifest, run results and catalog files (parsed as UTF-8 bytes if not specified)",
+    )
+    parser.add_argument(
+        "--run-results",
+        default=None,
+        help="Path or URL of a dbt run_results.json, used to derive refresh keys",
+    )
+    parser.add_argument(
+        "--catalog",
+        default=None,
+        help="Path or URL of a dbt catalog.json, used to type columns without a data_type",
+    )
+    parser.add_argument(
+        "--path",
+        dest="paths",
+        action="append",
+        default=[],
+        help="Only include models whose path starts with this prefix (repeatable)",
+    )
+    parser.add_argument(
+        "--tag",
+        dest="tags",
+        action="append",
+        default=[],
+        help="Only include models with this tag (repeatable)",
+    )
+    parser.add_argument(
+        "--name",
+        dest="names",
+        action="append",
+        default=[],
+        help="Only include the model with this name (repeatable)",
+    )
+    parser.add_argument(
+        "--select",
+        action="append",
+        default=[],
+        help="Only include models selected by this lineage selector, e.g. '+exposure:dashboard' or '2+orders' (repeatable)",
+    )
+
+
+def _generate(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    dbt = _load_dbt(args)
+    load_time = time.perf_counter() - start
+
+    generator = CubeGenerator(dbt, args.output)
+    report = generator.generate_cubes(
+        workers=args.workers,
+        incremental=args.incremental,
+        verbose=args.verbose,
+        shard_index=args.shard_index,
+        shard_count=args.shard_count,
+        bundle=args.bundle,
+        macros=args.macros,
+    )
+    report.add_timing("load", load_time)
+
+    print(report.summary())
+    return 0
+
+
+def _merge(args: argparse.Namespace) -> int:
+    try:
+        files = merge_shards(_load_dbt(args), args.shards, args.output)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(f"Merged {len(files)} cube(s) from {len(args.shards)} shard output(s)")
+    return 0
+
+
+def _validate(args: argparse.Namespace) -> int:
+    report = _load_dbt(args).validate()
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def _recommend(args: argparse.Namespace) -> int:
+    analyzer = QueryLogAnalyzer(_load_dbt(args), max_patterns=args.max_patterns)
+    analyzer.read(args.log)
+    cubes = analyzer.as_cubes(args.top)
+    if args.output is None:
+        print(cubes, end="")
+    else:
+        with open(args.output, "w") as f:
+            f.write(cubes)
+    print(
+        f"Analyzed {analyzer.queries} queries, skipped {analyzer.skipped} unreadable line(s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _watch(args: argparse.Namespace) -> int:
+    watcher = ManifestWatcher(
+        args.manifest,
+        args.output,
+        paths=args.paths,
+        tags=args.tags,
+        names=args.names,
+        select=args.select,
+        encoding=args.encoding,
+        run_results_path=args.run_results,
+        catalog_path=args.catalog,
+        interval=args.interval,
+        debounce=args.debounce,
+    )
+    try:
+        watcher.watch(verbose=args.verbose)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _check_arguments(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> None:
+    if getattr(args, "shard_count", None) is None:
+        if getattr(args, "shard_index", None) is not None:
+            parser.error("--shard-index requires --shard-count")
+    elif args.shard_index is None:
+        parser.error("--shard-count requires --shard-index")
+    if getattr(args, "bundle", None) is not None:
+        if args.incremental or args.shard_count is not None:
+            parser.error("--bundle cannot be combined with --incremental or sharding")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cube-dbt", description="dbt integration for Cube"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser(
+        "generate", help="Generate cube YAML Jinja templates from a dbt manifest"
+    )
+    _add_manifest_arguments(generate)
+    generate.add_argument(
+        "-o",
+        "--output",
+        default=".",
+        help="Cube schema directory, templates are written to <output>/cubes",
+    )
+    generate.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of threads rendering and writing templates",
+    )
+    mode = generate.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite templates whose content has changed",
+    )
+    mode.add_argument(
+        "--full",
+        dest="incremental",
+        action="store_false",
+        help="Rewrite every template (default)",
+    )
+    generate.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Print a line for every generated cube",
+    )
+    generate.add_argument(
+        "--shard-index",
+        type=int,
+        default=None,
+        help="Only generate the models of this shard, from 0 to --shard-count - 1",
+    )
+    generate.add_argument(
+        "--shard-count",
+        type=int,
+        default=None,
+        help="Number of shards the models are deterministically split into",
+    )
+    generate.add_argument(
+        "--bundle",
+        default=None,
+        help="Write all templates into this single .zip, .tar or .yml file, with an offsets index next to it",
+    )
+    generate.add_argument(
+        "--macros",
+        action="store_true",
+        help="Write one shared macro template and a small stub per model calling it",
+    )
+    generate.set_defaults(func=_generate)
+
+    merge = subparsers.add_parser(
+        "merge",
+        help="Verify that shard outputs cover every model exactly once and combine them",
+    )
+    _add_manifest_arguments(merge)
+    merge.add_argument(
+        "shards", nargs="+", help="Output directories of the generate shards"
+    )
+    merge.add_argument(
+        "-o",
+        "--output",
+        default=".",
+        help="Cube schema directory, templates are copied to <output>/cubes",
+    )
+    merge.set_defaults(func=_merge)
+
+    validate = subparsers.add_parser(
+        "validate", help="Check all models for problems without generating templates"
+    )
+    _add_manifest_arguments(validate)
+    validate.set_defaults(func=_validate)
+
+    recommend = subparsers.add_parser(
+        "recommend",
+        help="Recommend rollup pre-aggregations from a Cube query log",
+    )
+    _add_manifest_arguments(recommend)
+    recommend.add_argument(
+        "log", help="Path of a JSON lines query log, optionally gzip- or zstd-compressed"
+    )
+    recommend.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of query patterns to recommend rollups for",
+    )
+    recommend.add_argument(
+        "--max-patterns",
+        type=int,
+        default=10000,
+        help="Maximum number of distinct query patterns kept in memory",
+    )
+    recommend.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="File the recommended cubes are written to (defaults to stdout)",
+    )
+    recommend.set_defaults(func=_recommend)
+
+    watch = subparsers.add_parser(
+        "watch", help="Regenerate cube templates whenever a local manifest.json changes"
+    )
+    _add_manifest_arguments(watch)
+    watch.add_argument(
+        "-o",
+        "--output",
+        default=".",
+        help="Cube schema directory, templates are written to <output>/cubes",
+    )
+    watch.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between polls of the manifest",
+    )
+    watch.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Seconds the manifest must stay unchanged before it is reparsed",
+    )
+    watch.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Print a line for every generated cube",
+    )
+    watch.set_defaults(func=_watch)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    _check_arguments(parser, args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,91 @@
 from cube_dbt.dump import dump
 
+COLUMN_TO_DIMENSION_TYPES = {
+    "time": "time",
+    "date": "time",
+    "datetime": "time",
+    "timestamp": "time",
+    "string": "string",
+    "number": "number",
+    "numeric": "number",
+    "boolean": "boolean",
+    "bool": "boolean",
+    "geo": "geo",
+    "geography": "geo",
+}
+
+# Warehouse types reported by catalog.json, lowercased and without parameters
+WAREHOUSE_TO_DIMENSION_TYPES = {
+    **{
+        type: "number"
+        for type in (
+            "int",
+            "integer",
+            "smallint",
+            "tinyint",
+            "bigint",
+            "byteint",
+            "int2",
+            "int4",
+            "int8",
+            "int64",
+            "float",
+            "float4",
+            "float8",
+            "float64",
+            "double",
+            "double precision",
+            "real",
+            "decimal",
+            "numeric",
+            "bignumeric",
+            "number",
+            "money",
+        )
+    },
+    **{
+        type: "time"
+        for type in (
+            "date",
+            "datetime",
+            "datetime2",
+            "smalldatetime",
+            "datetimeoffset",
+            "timestamp",
+            "timestamptz",
+            "timestamp_ntz",
+            "timestamp_ltz",
+            "timestamp_tz",
+            "timestamp with time zone",
+            "timestamp without time zone",
+        )
+    },
+    "boolean": "boolean",
+    "bool": "boolean",
+    "bit": "boolean",
+    "geography": "geo",
+    "geometry": "geo",
+}
+
+
+def warehouse_dimension_type(warehouse_type: str) -> str:
+    """
+    Maps a warehouse column type, e.g. 'NUMBER(38,0)' or 'timestamp(6) with time zone',
+    to a dimension type. Types without a better match, e.g. text or arrays, are strings.
+    """
+    name, _, rest = warehouse_type.lower().partition("(")
+    rest = rest.partition(")")[2]
+    name = " ".join((name + rest).split())
+    return WAREHOUSE_TO_DIMENSION_TYPES.get(name, "string")
+
 
 class Column:
-    def __init__(self, model_name: str, column_dict: dict) -> None:
+    def __init__(
+        self, model_name: str, column_dict: dict, catalog_column: dict = None
+    ) -> None:
         self._model_name = model_name
         self._column_dict = column_dict
+        self._catalog_column = catalog_column
         pass
 
     def __repr__(self) -> str:
@@ -24,36 +105,33 @@ class Column:
 
     @property
     def type(self) -> str:
+        """
+        Dimension type from the declared data_type. Without it, the warehouse
+        type from catalog.json is used if loaded, and 'string' otherwise.
+        """
         if (
             not "data_type" in self._column_dict
             or self._column_dict["data_type"] == None
         ):
+            if self._catalog_column is not None:
+                return warehouse_dimension_type(self._catalog_column["type"])
             return "string"
 
-        column_to_dimension_types = {
-            "time": "time",
-            "date": "time",
-            "datetime": "time",
-            "timestamp": "time",
-            "string": "string",
-            "number": "number",
-            "numeric": "number",
-            "boolean": "boolean",
-            "bool": "boolean",
-            "geo": "geo",
-            "geography": "geo",
-        }
-        if not self._column_dict["data_type"] in column_to_dimension_types:
+        if not self._column_dict["data_type"] in COLUMN_TO_DIMENSION_TYPES:
             raise RuntimeError(
                 f"Unknown column type of {self._model_name}.{self.name}: {self._column_dict['data_type']}"
             )
 
-        return column_to_dimension_types[self._column_dict["data_type"]]
+        return COLUMN_TO_DIMENSION_TYPES[self._column_dict["data_type"]]
 
     @property
     def meta(self) -> dict:
         return self._column_dict["meta"]
 
+    @property
+    def tags(self) -> list:
+        return self._column_dict["tags"]
+
     @property
     def primary_key(self) -> bool:
         """
@@ -0,0 +1,189 @@
+from array import array
+
+from cube_dbt.column import COLUMN_TO_DIMENSION_TYPES, Column, warehouse_dimension_type
+from cube_dbt.model import Model
+
+# Dimension type codes, the index in this tuple. Unknown types are coded as -1
+DIMENSION_TYPES = ("string", "number", "time", "boolean", "geo")
+UNKNOWN_TYPE = -1
+
+# Column flags, combined as a bitmask
+PRIMARY_KEY = 1
+HAS_META = 2
+HAS_DESCRIPTION = 4
+
+_TYPE_CODES = {
+    data_type: DIMENSION_TYPES.index(dimension_type)
+    for data_type, dimension_type in COLUMN_TO_DIMENSION_TYPES.items()
+}
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ColumnarCatalog:
+    """
+    Columnar index of all columns of a set of models, for bulk queries such as
+    "all time columns" or "every model missing a primary key".
+
+    Every column is a row in parallel arrays of model index, column name id,
+    dimension type code and flags. The arrays are stdlib `array`s, which NumPy
+    wraps without copying when it is installed, so queries over hundreds of
+    thousands of columns don't walk Python objects.
+    """
+
+    def __init__(self, models: list[Model]) -> None:
+        self.models = list(models)
+        self.names = []
+        self.model_index = array("I")
+        self.name_id = array("I")
+        self.type_code = array("b")
+        self.flags = array("B")
+
+        name_ids = {}
+        for index, model in enumerate(self.models):
+            for column in model._model_dict.get("columns", {}).values():
+                name = column["name"]
+                name_id = name_ids.get(name)
+                if name_id is None:
+                    name_id = name_ids[name] = len(self.names)
+                    self.names.append(name)
+
+                data_type = column.get("data_type")
+                if data_type is None:
+                    catalog_column = model.catalog_column(name)
+                    type_code = (
+                        0
+                        if catalog_column is None
+                        else DIMENSION_TYPES.index(
+                            warehouse_dimension_type(catalog_column["type"])
+                        )
+                    )
+                else:
+                    type_code = _TYPE_CODES.get(data_type, UNKNOWN_TYPE)
+
+                flags = 0
+                if "primary_key" in column.get("tags", ()):
+                    flags |= PRIMARY_KEY
+                if column.get("meta"):
+                    flags |= HAS_META
+                if column.get("description"):
+                    flags |= HAS_DESCRIPTION
+
+                self.model_index.append(index)
+                self.name_id.append(name_id)
+                self.type_code.append(type_code)
+                self.flags.append(flags)
+
+        self._name_ids = name_ids
+
+    def __len__(self) -> int:
+        return len(self.model_index)
+
+    def to_numpy(self) -> dict:
+        """
+        Returns the arrays as NumPy arrays sharing memory with the catalog.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        numpy = _numpy()
+        if numpy is None:
+            raise ImportError("NumPy is required for ColumnarCatalog.to_numpy()")
+        return {
+            "model_index": numpy.frombuffer(self.model_index, dtype=numpy.uint32),
+            "name_id": numpy.frombuffer(self.name_id, dtype=numpy.uint32),
+            "type_code": numpy.frombuffer(self.type_code, dtype=numpy.int8),
+            "flags": numpy.frombuffer(self.flags, dtype=numpy.uint8),
+        }
+
+    def _type_code(self, type: str) -> int:
+        if type is None:
+            return None
+        if type == "unknown":
+            return UNKNOWN_TYPE
+        return DIMENSION_TYPES.index(type)
+
+    def select(
+        self,
+        type: str = None,
+        name: str = None,
+        primary_key: bool = None,
+        has_meta: bool = None,
+    ) -> list[int]:
+        """
+        Returns the row numbers of columns matching all given criteria.
+
+        Args:
+            type (str, optional): Dimension type, e.g. 'time', or 'unknown' for unmapped data types.
+            name (str, optional): Exact column name.
+            primary_key (bool, optional): Whether the column is a primary key.
+            has_meta (bool, optional): Whether the column has non-empty meta.
+        """
+        type_code = self._type_code(type)
+        name_id = None
+        if name is not None:
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                return []
+        flag_mask = 0
+        flag_value = 0
+        for flag, wanted in ((PRIMARY_KEY, primary_key), (HAS_META, has_meta)):
+            if wanted is not None:
+                flag_mask |= flag
+                flag_value |= flag if wanted else 0
+
+        numpy = _numpy()
+        if numpy is not None:
+            arrays = self.to_numpy()
+            mask = numpy.ones(len(self), dtype=bool)
+            if type_code is not None:
+                mask &= arrays["type_code"] == type_code
+            if name_id is not None:
+                mask &= arrays["name_id"] == name_id
+            if flag_mask:
+                mask &= (arrays["flags"] & flag_mask) == flag_value
+            return numpy.flatnonzero(mask).tolist()
+
+        return list(
+            row
+            for row in range(len(self))
+            if (type_code is None or self.type_code[row] == type_code)
+            and (name_id is None or self.name_id[row] == name_id)
+            and (self.flags[row] & flag_mask) == flag_value
+        )
+
+    def column(self, row: int) -> Column:
+        return self.models[self.model_index[row]].column(self.names[self.name_id[row]])
+
+    def columns(self, rows: list[int]) -> list[Column]:
+        return list(self.column(row) for row in rows)
+
+    def models_of(self, rows: list[int]) -> list[Model]:
+        """
+        Returns the distinct models owning the given rows, in model order.
+        """
+        indexes = sorted(set(self.model_index[row] for row in rows))
+        return list(self.models[index] for index in indexes)
+
+    def models_without_primary_key(self) -> list[Model]:
+        with_primary_key = set(
+            self.model_index[row] for row in self.select(primary_key=True)
+        )
+        return list(
+            model
+            for index, model in enumerate(self.models)
+            if index not in with_primary_key
+        )
+
+    def count_by_type(self) -> dict:
+        counts = {
+            type: self.type_code.count(code) for code, type in enumerate(DIMENSION_TYPES)
+        }
+        counts["unknown"] = self.type_code.count(UNKNOWN_TYPE)
+        return counts
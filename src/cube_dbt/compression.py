@@ -0,0 +1,94 @@
+"""
+Transparent decompression of gzip- and zstd-compressed manifests.
+
+Compression is detected by magic bytes, or by the Content-Encoding header of
+HTTP responses, and the data is decompressed while it is read from the file
+or the network, without writing the inflated manifest to disk.
+"""
+
+import importlib.util
+import io
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+CHUNK_SIZE = 1 << 20
+
+
+def detect(prefix: bytes, content_encoding: str = None) -> str or None:
+    """
+    Returns 'gzip', 'zstd' or None from the first bytes of a stream and its Content-Encoding, if any.
+    """
+    if content_encoding:
+        encoding = content_encoding.strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            return "gzip"
+        if encoding == "zstd":
+            return "zstd"
+    if prefix.startswith(GZIP_MAGIC):
+        return "gzip"
+    if prefix.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _zstd_reader(stream):
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "The zstandard package is required to read zstd-compressed manifests"
+        )
+    return zstandard.ZstdDecompressor().stream_reader(stream)
+
+
+def accept_encoding() -> str:
+    """
+    Returns the Accept-Encoding header for manifest requests, only announcing zstd when it can be read.
+    """
+    if importlib.util.find_spec("zstandard") is None:
+        return "gzip"
+    return "gzip, zstd"
+
+
+def _open(stream, content_encoding: str = None) -> tuple:
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+    prefix = stream.peek(len(ZSTD_MAGIC))[: len(ZSTD_MAGIC)]
+    compression = detect(prefix, content_encoding)
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=stream), compression
+    if compression == "zstd":
+        return _zstd_reader(stream), compression
+    return stream, compression
+
+
+def open_stream(stream, content_encoding: str = None):
+    """
+    Wraps a binary stream so that reading it yields decompressed data.
+
+    Args:
+        stream: A binary file-like object, e.g. an open file or an HTTP response.
+        content_encoding (str, optional): The Content-Encoding of an HTTP response.
+    """
+    return _open(stream, content_encoding)[0]
+
+
+def read(stream, content_encoding: str = None) -> bytes or bytearray:
+    """
+    Reads a possibly compressed binary stream. Compressed data is decompressed
+    chunk by chunk into a single growing buffer, instead of joining a list of
+    chunks, so that only one inflated copy is held.
+    """
+    reader, compression = _open(stream, content_encoding)
+    if compression is None:
+        return reader.read()
+
+    buffer = bytearray()
+    while True:
+        chunk = reader.read(CHUNK_SIZE)
+        if not chunk:
+            return buffer
+        buffer += chunk
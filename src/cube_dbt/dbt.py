@@ -1,96 +1,676 @@
-import json
-import locale
-from urllib.request import urlopen
+from collections.abc import Iterator
 
+from cube_dbt import compression, jsonlib
 from cube_dbt.model import Model
 from cube_dbt.test import Test
 
+# Like typing.TYPE_CHECKING, without importing typing at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from cube_dbt.columnar import ColumnarCatalog
+    from cube_dbt.validation import ValidationReport
+
+# Node properties that change on every dbt parse without affecting the model
+VOLATILE_NODE_KEYS = ("created_at",)
+
+# Node properties kept by Dbt.compact()
+COMPACT_MODEL_KEYS = (
+    "unique_id",
+    "name",
+    "resource_type",
+    "package_name",
+    "path",
+    "description",
+    "relation_name",
+    "database",
+    "schema",
+    "alias",
+    "checksum",
+    "meta",
+    "columns",
+    "config",
+)
+COMPACT_CONFIG_KEYS = ("materialized", "tags", "partition_by")
+COMPACT_COLUMN_KEYS = ("name", "description", "data_type", "tags", "meta")
+COMPACT_TEST_KEYS = (
+    "unique_id",
+    "name",
+    "resource_type",
+    "description",
+    "tags",
+    "refs",
+    "meta",
+    "raw_code",
+    "test_metadata",
+    "depends_on",
+)
+
+
+def _pick(data: dict, keys: tuple) -> dict:
+    return {key: data[key] for key in keys if key in data}
+
+
+def _compact_model_node(node: dict) -> dict:
+    compact = _pick(node, COMPACT_MODEL_KEYS)
+    if "config" in compact:
+        compact["config"] = _pick(compact["config"], COMPACT_CONFIG_KEYS)
+    if "columns" in compact:
+        compact["columns"] = {
+            key: _pick(column, COMPACT_COLUMN_KEYS)
+            for key, column in compact["columns"].items()
+        }
+    return compact
+
+
+def _compact_test_node(node: dict) -> dict:
+    compact = _pick(node, COMPACT_TEST_KEYS)
+    if "config" in node:
+        compact["config"] = _pick(node["config"], ("severity",))
+    return compact
+
+
+def _deep_size(data, seen: set = None) -> int:
+    """
+    Approximate memory used by nested dicts, lists and scalars, counting shared objects once.
+    """
+    import sys
+
+    if seen is None:
+        seen = set()
+    stack = [data]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return size
+
+
+class CompactionReport:
+    """
+    Result of Dbt.compact: approximate memory held before and after releasing the manifest.
+    """
+
+    def __init__(self, before_bytes: int, after_bytes: int) -> None:
+        self.before_bytes = before_bytes
+        self.after_bytes = after_bytes
+
+    def __repr__(self) -> str:
+        return self.summary()
+
+    @staticmethod
+    def _format(size: int) -> str:
+        return f"{size / 1e6:.1f} MB" if size >= 1e6 else f"{size / 1e3:.1f} kB"
+
+    def summary(self) -> str:
+        saved = self.before_bytes - self.after_bytes
+        ratio = saved / self.before_bytes * 100 if self.before_bytes else 0
+        return (
+            f"Compacted {self._format(self.before_bytes)} to {self._format(self.after_bytes)} "
+            f"({ratio:.0f}% released)"
+        )
+
+
+class ManifestChangeset:
+    """
+    Result of Dbt.apply_manifest: the models that were added, changed, removed
+    or left unchanged by a new version of the manifest.
+    """
+
+    def __init__(self) -> None:
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.unchanged = []
+        # unique_id -> previous Model, for changed and removed models
+        self.previous = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"ManifestChangeset(added={len(self.added)}, changed={len(self.changed)}, "
+            f"removed={len(self.removed)}, unchanged={len(self.unchanged)})"
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def _read_file(path: str, encoding: str = None) -> dict:
+    with open(path, "rb") as file:
+        data = compression.read(file)
+    # JSON backends parse UTF-8 bytes directly, other encodings are decoded first
+    if encoding is not None and encoding.lower().replace("-", "") not in ("utf8", "ascii"):
+        data = data.decode(encoding)
+    return jsonlib.loads(data)
+
+
+def _read_url(url: str) -> dict:
+    # urllib pulls in http.client and email, only import it when needed
+    from urllib.request import Request, urlopen
+
+    request = Request(url, headers={"Accept-Encoding": compression.accept_encoding()})
+    with urlopen(request) as response:
+        return jsonlib.loads(
+            compression.read(response, response.headers.get("Content-Encoding"))
+        )
+
+
+def _merge_manifests(manifests) -> dict:
+    merged = {
+        "metadata": None,
+        "nodes": {},
+        "exposures": {},
+        "parent_map": {},
+        "child_map": {},
+    }
+    owned = set()
+    for manifest in manifests:
+        metadata = manifest.get("metadata", {})
+        if merged["metadata"] is None:
+            merged["metadata"] = metadata
+        project_name = metadata.get("project_name")
+
+        for section in ("nodes", "exposures"):
+            target = merged[section]
+            for unique_id, node in manifest.get(section, {}).items():
+                is_owner = project_name is not None and node.get("package_name") == project_name
+                if unique_id not in target or (is_owner and unique_id not in owned):
+                    target[unique_id] = node
+                if is_owner:
+                    owned.add(unique_id)
+
+        for section in ("parent_map", "child_map"):
+            target = merged[section]
+            for unique_id, neighbors in manifest.get(section, {}).items():
+                existing = target.get(unique_id)
+                if existing is None:
+                    target[unique_id] = neighbors
+                elif existing is not neighbors:
+                    seen = set(existing)
+                    target[unique_id] = existing + list(
+                        neighbor for neighbor in neighbors if neighbor not in seen
+                    )
+    if merged["metadata"] is None:
+        merged["metadata"] = {}
+    return merged
+
 
 class Dbt:
-    def __init__(self, manifest: dict) -> None:
+    def __init__(
+        self, manifest: dict, run_results: dict = None, catalog: dict = None
+    ) -> None:
         self.manifest = manifest
         self.paths = ""
         self.tags = []
         self.names = []
+        self.select = []
+        self._selected_ids = None
         self._models = None
+        self._models_by_id = None
+        self._name_index = None
+        self._name_index_models = None
+        self._columnar = None
+        self._schema_version = None
+        self._compacted = False
+        self._run_results = {}
+        self._catalog = {}
+        if run_results is not None:
+            self.add_run_results(run_results)
+        if catalog is not None:
+            self.add_catalog(catalog)
         pass
 
     @staticmethod
-    def from_file(manifest_path: str, encoding: str = None) -> "Dbt":
+    def from_file(
+        manifest_path: str,
+        encoding: str = None,
+        run_results_path: str = None,
+        catalog_path: str = None,
+    ) -> "Dbt":
         """Reads a DBT manifest.json file from local path
 
         Args:
             manifest_path (str): The path to the manifest file, read from the top-level directory of the Cube environment
-            encoding (str, optional): Encoding for the manifest.json file. Uses the system locale preferred encoding if not specified.
+            encoding (str, optional): Encoding for the manifest.json file. The file is parsed as UTF-8 bytes if not specified.
+            run_results_path (str, optional): The path to a run_results.json file, used to derive refresh keys from the last build of models.
+            catalog_path (str, optional): The path to a catalog.json file, used to type columns without a data_type and for table statistics.
 
         Returns:
             Dbt: Dbt manifest class to interact with in Cube
         """
-        if encoding is None:
-            encoding = locale.getpreferredencoding()
-        with open(manifest_path, "r", encoding=encoding) as file:
-            manifest = json.loads(file.read())
-            return Dbt(manifest)
+        manifest = _read_file(manifest_path, encoding)
+        run_results = (
+            _read_file(run_results_path, encoding) if run_results_path else None
+        )
+        catalog = _read_file(catalog_path, encoding) if catalog_path else None
+        return Dbt(manifest, run_results, catalog)
 
     @staticmethod
-    def from_url(manifest_url: str) -> "Dbt":
+    def from_url(
+        manifest_url: str, run_results_url: str = None, catalog_url: str = None
+    ) -> "Dbt":
         """
         Creates an instance of the Dbt class by loading a JSON manifest from a specified URL.
 
         Args:
             manifest_url (str): The URL pointing to the JSON manifest file. This URL should be accessible and the file should be in a valid JSON format.
+            run_results_url (str, optional): The URL pointing to a run_results.json file, used to derive refresh keys from the last build of models.
+            catalog_url (str, optional): The URL pointing to a catalog.json file, used to type columns without a data_type and for table statistics.
 
         Returns:
             Dbt: An instance of the Dbt class initialized with the manifest loaded from the given URL.
         """
-        with urlopen(manifest_url) as file:
-            manifest = json.loads(file.read())
-            return Dbt(manifest)
+        manifest = _read_url(manifest_url)
+        run_results = _read_url(run_results_url) if run_results_url else None
+        catalog = _read_url(catalog_url) if catalog_url else None
+        return Dbt(manifest, run_results, catalog)
+
+    @staticmethod
+    def merge(*dbts: "Dbt") -> "Dbt":
+        """
+        Combines the manifests of several dbt projects, e.g. a dbt mesh, into one Dbt
+        with shared model, name and relationship indexes, so that models can be
+        joined across projects.
+
+        Nodes present in several manifests are kept once. The version from the
+        project owning the node is preferred over the stubs that other projects
+        hold for their cross-project refs. Node dicts are shared, not copied.
+
+        Returns:
+            Dbt: An unfiltered Dbt over the merged manifest.
+
+        Raises:
+            RuntimeError: If the manifest of one of the Dbts was released by compact().
+        """
+        if any(dbt._compacted for dbt in dbts):
+            raise RuntimeError(
+                "The manifest was released by compact(), it can't be merged"
+            )
+        dbt = Dbt(_merge_manifests(dbt.manifest for dbt in dbts))
+        for other in dbts:
+            dbt._run_results.update(other._run_results)
+            dbt._catalog.update(other._catalog)
+        return dbt
+
+    @staticmethod
+    def from_files(manifest_paths: list[str], encoding: str = None) -> "Dbt":
+        """
+        Reads and merges the manifest.json files of several dbt projects, see Dbt.merge.
+        Manifests are read one at a time, and only their nodes, exposures, parent_map
+        and child_map sections are kept, with nodes present in several manifests kept
+        once, so memory grows with the unique nodes rather than with the number of projects.
+
+        Args:
+            manifest_paths (list[str]): The paths to the manifest files.
+            encoding (str, optional): Encoding for the manifest.json files.
+
+        Returns:
+            Dbt: An unfiltered Dbt over the merged manifest.
+        """
+        return Dbt(
+            _merge_manifests(_read_file(path, encoding) for path in manifest_paths)
+        )
+
+    def add_run_results(self, run_results: dict) -> "Dbt":
+        """
+        Attaches the successful results of a dbt run_results.json to the models,
+        e.g. to tie refresh keys to the last build of each model. Results of
+        later runs override earlier ones.
+
+        Args:
+            run_results (dict): The parsed run_results.json.
+
+        Returns:
+            Dbt: This instance, for chaining.
+        """
+        for result in run_results["results"]:
+            if result["status"] == "success":
+                self._run_results[result["unique_id"]] = result
+        if self._models_by_id is not None:
+            for key, model in self._models_by_id.items():
+                model.set_run_result(self._run_results.get(key))
+        self._schema_version = None
+        return self
+
+    def add_catalog(self, catalog: dict) -> "Dbt":
+        """
+        Attaches the tables of a dbt catalog.json to the models, by unique_id.
+        Warehouse column types fill in columns without a declared data_type,
+        and table statistics are exposed as Model.row_count and Model.bytes.
+
+        Args:
+            catalog (dict): The parsed catalog.json.
+
+        Returns:
+            Dbt: This instance, for chaining.
+        """
+        self._catalog.update(catalog.get("nodes", {}))
+        if self._models_by_id is not None:
+            for key, model in self._models_by_id.items():
+                model.set_catalog_node(self._catalog.get(key))
+        self._schema_version = None
+        self._columnar = None
+        return self
 
     def filter(
-        self, paths: list[str] = [], tags: list[str] = [], names: list[str] = []
+        self,
+        paths: list[str] = [],
+        tags: list[str] = [],
+        names: list[str] = [],
+        select: list[str] = [],
     ) -> "Dbt":
+        """
+        Restricts the models to those matching all given criteria.
+
+        Args:
+            paths (list[str], optional): Path prefixes, a model matches if its path starts with any of them.
+            tags (list[str], optional): A model matches if it has all of these tags.
+            names (list[str], optional): A model matches if its name is one of these.
+            select (list[str], optional): Lineage selectors, a model matches if any of them selects it,
+                e.g. '+orders', '2+orders', 'orders+' or '+exposure:dashboard'. See cube_dbt.lineage.
+
+        Returns:
+            Dbt: This instance, for chaining.
+
+        Raises:
+            RuntimeError: If the manifest was released by compact(). The models are kept as they are.
+        """
+        if self._compacted:
+            raise RuntimeError(
+                "The manifest was released by compact(), the filter can't be changed"
+            )
         self.paths = paths
         self.tags = tags
         self.names = names
+        self.select = select
+        self._selected_ids = None
+        self._models = None
+        self._models_by_id = None
+        self._columnar = None
+        self._schema_version = None
         return self
 
+    def _lineage_selection(self, manifest: dict) -> set or None:
+        if not self.select:
+            return None
+        if self._selected_ids is None:
+            from cube_dbt.lineage import select
+
+            self._selected_ids = select(manifest, self.select)
+        return self._selected_ids
+
+    def _is_selected_model(self, key: str, node: dict, selected_ids: set = None) -> bool:
+        return (
+            node["resource_type"] == "model"
+            and (key in selected_ids if selected_ids is not None else True)
+            and node["config"]["materialized"] != "ephemeral"
+            and (
+                any(node["path"].startswith(path) for path in self.paths)
+                if self.paths
+                else True
+            )
+            and all(tag in node["config"]["tags"] for tag in self.tags)
+            and (node["name"] in self.names if self.names else True)
+        )
+
+    @staticmethod
+    def _tests_by_model(manifest: dict) -> dict:
+        tests = {}
+        for key, node in manifest["nodes"].items():
+            if node["resource_type"] == "test":
+                # Each test lists its dependencies on models. Our target is the last dependency, e.g. the model from which the test is being performed
+                # The dependency is a unique_id that we need to resolve to a model
+                model_unique_id = node["depends_on"]["nodes"][1]
+                tests.setdefault(model_unique_id, []).append(node)
+        return tests
+
+    def _build_models(self):
+        """
+        Yields (unique_id, model) for every selected model, with its run result,
+        catalog entry and tests attached.
+        """
+        if self.manifest is None:
+            raise RuntimeError(
+                "The manifest was released by compact(), models can't be reloaded"
+            )
+        selected_ids = self._lineage_selection(self.manifest)
+        # Test nodes are grouped by model first, so each model gets its tests in one lookup
+        tests_by_model = self._tests_by_model(self.manifest)
+        for key, node in self.manifest["nodes"].items():
+            if not self._is_selected_model(key, node, selected_ids):
+                continue
+            model = Model(node)
+            model.set_run_result(self._run_results.get(key))
+            model.set_catalog_node(self._catalog.get(key))
+            for test in tests_by_model.get(key, []):
+                model.add_test(Test(test))
+            yield key, model
+
     def _init_models(self):
         if self._models is None:
-            # First, initialize all models without tests
-            models_temp = {
-                key: Model(node)
-                for key, node in self.manifest["nodes"].items()
-                if node["resource_type"] == "model"
-                and node["config"]["materialized"] != "ephemeral"
-                and (
-                    any(node["path"].startswith(path) for path in self.paths)
-                    if self.paths
-                    else True
+            self._models_by_id = dict(self._build_models())
+            self._models = list(self._models_by_id.values())
+
+    @staticmethod
+    def _node_unchanged(old: dict, new: dict) -> bool:
+        if old is new:
+            return True
+        # The checksum only covers the SQL file, so an equal checksum still
+        # needs a comparison of the properties coming from YAML files
+        if old.get("checksum") != new.get("checksum"):
+            return False
+        keys = set(old).union(new).difference(VOLATILE_NODE_KEYS)
+        if not all(old.get(key) == new.get(key) for key in keys):
+            return False
+        # Dict equality ignores order, but the column order is that of the dimensions
+        return list(old.get("columns", {})) == list(new.get("columns", {}))
+
+    def apply_manifest(self, new_manifest: dict) -> ManifestChangeset:
+        """
+        Updates the models from a new version of the manifest, keeping the current filter.
+
+        Models are diffed by unique_id and node checksum. Unchanged models are kept
+        as-is, along with their already initialized columns and measures, but
+        point at the new nodes so the old manifest can be freed. Only added or
+        changed models are rebuilt.
+
+        Args:
+            new_manifest (dict): The new parsed manifest.json.
+
+        Returns:
+            ManifestChangeset: The added, changed, removed and unchanged models.
+        """
+        self._init_models()
+        changeset = ManifestChangeset()
+        new_tests = self._tests_by_model(new_manifest)
+        self._selected_ids = None
+        selected_ids = self._lineage_selection(new_manifest)
+
+        models = {}
+        for key, node in new_manifest["nodes"].items():
+            if not self._is_selected_model(key, node, selected_ids):
+                continue
+            tests = new_tests.get(key, [])
+            if self._compacted:
+                node = _compact_model_node(node)
+                tests = list(_compact_test_node(test) for test in tests)
+            old_model = self._models_by_id.get(key)
+            if (
+                old_model is not None
+                and self._node_unchanged(old_model._model_dict, node)
+                and len(old_model.tests) == len(tests)
+                and all(
+                    self._node_unchanged(old_test._test_dict, test)
+                    for old_test, test in zip(old_model.tests, tests)
                 )
-                and all(tag in node["config"]["tags"] for tag in self.tags)
-                and (node["name"] in self.names if self.names else True)
-            }
+            ):
+                old_model._rebind(node, tests)
+                models[key] = old_model
+                changeset.unchanged.append(old_model)
+                continue
+
+            model = Model(node)
+            model.set_run_result(self._run_results.get(key))
+            model.set_catalog_node(self._catalog.get(key))
+            for test in tests:
+                model.add_test(Test(test))
+            models[key] = model
+            if old_model is None:
+                changeset.added.append(model)
+            else:
+                changeset.changed.append(model)
+                changeset.previous[key] = old_model
 
-            # Now, iterate over all tests to assign them to their respective models
-            for key, node in self.manifest["nodes"].items():
-                if node["resource_type"] == "test":
-                    test = Test(node)
-                    # Each test lists its dependencies on models. Our target is the last dependency, e.g. the model from which the test is being performed
-                    # The dependency is a unique_id that we need to resolve to a model
-                    model_unique_id = node["depends_on"]["nodes"][1]
+        for key, old_model in self._models_by_id.items():
+            if key not in models:
+                changeset.removed.append(old_model)
+                changeset.previous[key] = old_model
 
-                    # Check if the model for this test exists in our temporary models map
-                    if model_unique_id in models_temp:
-                        models_temp[model_unique_id].add_test(test)
+        self.manifest = None if self._compacted else new_manifest
+        self._models_by_id = models
+        self._models = list(models.values())
+        self._columnar = None
+        self._schema_version = None
+        return changeset
+
+    def compact(self, report: bool = True) -> CompactionReport or None:
+        """
+        Releases the parsed manifest once the models are built, keeping only the
+        node properties cube_dbt uses (see COMPACT_MODEL_KEYS), e.g. in long-lived
+        Cube workers. Models, columns, measures, tests, validation and the schema
+        version keep working, and apply_manifest keeps the models compact.
+        Changing the filter afterwards is not possible, as it needs the manifest.
 
-            self._models = list(models_temp.values())
+        Args:
+            report (bool, optional): Measure the memory before and after, which walks the whole manifest once.
+
+        Returns:
+            CompactionReport or None: Approximate memory before and after, if requested.
+        """
+        self._init_models()
+        before = _deep_size(self.manifest) if report and self.manifest is not None else 0
+
+        for model in self._models:
+            model._model_dict = _compact_model_node(model._model_dict)
+            # Columns are rebuilt on the compacted column dicts on next access
+            model._columns = None
+            model._measures = None
+            for test in model.tests:
+                test._test_dict = _compact_test_node(test._test_dict)
+
+        self.manifest = None
+        self._compacted = True
+        self._columnar = None
+
+        if not report:
+            return None
+        seen = set()
+        after = sum(
+            _deep_size(model._model_dict, seen)
+            + sum(_deep_size(test._test_dict, seen) for test in model.tests)
+            for model in self._models
+        )
+        return CompactionReport(before, after)
 
     @property
     def models(self) -> list[Model]:
         self._init_models()
         return self._models
 
+    def iter_models(self) -> Iterator[Model]:
+        """
+        Yields the models one at a time, with their tests attached, without
+        keeping them. For one-pass jobs over large projects, memory is then
+        bounded by the largest model instead of the whole project. If the
+        models are already loaded, e.g. through Dbt.models, those are yielded.
+
+        Otherwise every call builds new Model objects, so identity and lazily
+        built columns are not shared between iterations.
+        """
+        if self._models is not None:
+            yield from self._models
+            return
+        for _, model in self._build_models():
+            yield model
+
+    def schema_version(self) -> str:
+        """
+        Stable digest of everything in the filtered models that affects the generated
+        cubes, for use in Cube's schemaVersion hook. Changes to macros, docs, SQL bodies
+        or models outside of the filter don't change it, so they don't trigger a
+        recompilation of the data model.
+
+        Per-model digests are kept on the models, so after apply_manifest only changed
+        models are hashed again. The result is memoized until the models change.
+
+        Returns:
+            str: Hex digest.
+        """
+        if self._schema_version is None:
+            import hashlib
+
+            self._init_models()
+            digest = hashlib.sha256()
+            for key, model in sorted(self._models_by_id.items()):
+                digest.update(key.encode("utf-8"))
+                digest.update(model.fingerprint().encode("ascii"))
+            self._schema_version = digest.hexdigest()
+        return self._schema_version
+
+    def columnar(self) -> "ColumnarCatalog":
+        """
+        Returns a columnar index of the columns of all models for bulk queries, e.g.
+        dbt.columnar().select(type='time') or dbt.columnar().models_without_primary_key()
+
+        Returns:
+            ColumnarCatalog: The catalog, built once and reused until the models change.
+        """
+        if self._columnar is None:
+            from cube_dbt.columnar import ColumnarCatalog
+
+            self._columnar = ColumnarCatalog(self.models)
+        return self._columnar
+
+    def validate(self) -> "ValidationReport":
+        """
+        Checks all models in one sweep and returns every problem found, e.g. for
+        use as a pre-deploy gate, instead of raising on the first one while rendering.
+
+        Returns:
+            ValidationReport: Aggregated issues of all models.
+        """
+        from cube_dbt.validation import validate_models
+
+        return validate_models(self.models)
+
+    def to_cube_dicts(self) -> list[dict]:
+        """
+        Returns the cubes of all models as dicts, see Model.to_cube_dict.
+        """
+        return list(model.to_cube_dict() for model in self.models)
+
+    def to_cube_json(self) -> bytes:
+        """
+        Returns the cubes of all models as a UTF-8 encoded JSON document of the
+        form {"cubes": [...]}, serialized with orjson when it is installed.
+        """
+        return jsonlib.dumps({"cubes": self.to_cube_dicts()})
+
     def model(self, name: str) -> Model:
         self._init_models()
+        if self._name_index_models is not self._models:
+            # Rebuilt whenever the models change, first model wins on duplicate names
+            self._name_index = {}
+            for model in self._models:
+                self._name_index.setdefault(model.name, model)
+            self._name_index_models = self._models
+        if name in self._name_index:
+            return self._name_index[name]
         return next(model for model in self._models if model.name == name)
@@ -1,4 +1,4 @@
-import yaml
+from functools import lru_cache
 
 
 class SafeString(str):
@@ -8,9 +8,22 @@ class SafeString(str):
         self.is_safe = True
 
 
-class Dumper(yaml.Dumper):
-    def increase_indent(self, flow=False, indentless=False):
-        return super(Dumper, self).increase_indent(flow, indentless)
+@lru_cache(maxsize=None)
+def _dumper():
+    # PyYAML is imported on first dump rather than on import of cube_dbt
+    import yaml
+
+    class Dumper(yaml.Dumper):
+        def increase_indent(self, flow=False, indentless=False):
+            return super(Dumper, self).increase_indent(flow, indentless)
+
+    return yaml, Dumper
+
+
+def __getattr__(name: str):
+    if name == "Dumper":
+        return _dumper()[1]
+    raise AttributeError(f"module 'cube_dbt.dump' has no attribute '{name}'")
 
 
 def indent_string(string: str, indent: int) -> str:
@@ -20,6 +33,7 @@ def indent_string(string: str, indent: int) -> str:
 
 
 def dump(data, indent: int = 0) -> str:
+    yaml, Dumper = _dumper()
     dump = yaml.dump(
         data,
         Dumper=Dumper,
@@ -1,7 +1,63 @@
+import hashlib
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+from cube_dbt.bundle import BundleWriter
 from cube_dbt.dbt import Dbt
 from cube_dbt.model import Model
+from cube_dbt.shard import iter_shard_models, shard_models, write_record
+
+# Shared macro rendering the cube of any model, written next to the per-model stubs
+MACROS_FILE = "cube_dbt.jinja"
+
+MACROS_TEMPLATE = """{%- macro cube(name) -%}
+{%- set model = dbt_model(name) -%}
+cubes:
+  - {{ model.as_cube() }}
+{%- if model.has_refresh_key() %}
+    refresh_key:
+      {{ model.as_refresh_key() }}
+{%- endif %}
+{%- if model.has_dimensions() %}
+    dimensions:
+      {{ model.as_dimensions() }}
+{%- endif %}
+{%- if model.has_joins() %}
+    joins:
+      {{ model.as_joins() }}
+{%- endif %}
+{%- if model.has_measures() %}
+    measures:
+      {{ model.as_measures() }}
+{%- endif %}
+{%- if model.has_pre_aggregations() %}
+    pre_aggregations:
+      {{ model.as_pre_aggregations() }}
+{%- endif %}
+{%- endmacro %}
+"""
+
+
+def _map_in_order(function, items, workers: int):
+    """
+    Lazily maps function over items on up to `workers` threads, yielding results
+    in order. Unlike Executor.map, items are submitted as results are consumed,
+    with at most two per worker in flight, so an iterator of items is never
+    materialized as a whole.
+    """
+    if workers <= 1:
+        yield from map(function, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
 
 class CubeYaml:
@@ -36,6 +92,18 @@ class CubeYaml:
         """
         return "cubes:\n  - {{ model.as_cube() }}\n"
 
+    def _refresh_key_template(self) -> str:
+        """
+        Generates the refresh key Jinja template part.
+
+        Returns:
+            str: The Jinja template part for the refresh key definition.
+        """
+        if self.model._as_refresh_key():
+            return "    refresh_key:\n      {{ model.as_refresh_key() }}\n"
+
+        return ""
+
     def _dimensions_template(self) -> str:
         """
         Generates the dimensions Jinja template part.
@@ -76,6 +144,18 @@ class CubeYaml:
 
         return ""
 
+    def _pre_aggregations_template(self) -> str:
+        """
+        Generates the pre-aggregations Jinja template part.
+
+        Returns:
+            str: The Jinja template part for pre-aggregations definition.
+        """
+        if len(self.model._as_pre_aggregations()) > 0:
+            return "    pre_aggregations:\n      {{ model.as_pre_aggregations() }}\n"
+
+        return ""
+
     def generate_template(self) -> str:
         """
         Generates the complete cube YAML Jinja template.
@@ -86,30 +166,246 @@ class CubeYaml:
         template_parts = [
             self._model_template(),
             self._cubes_template(),
+            self._refresh_key_template(),
             self._dimensions_template(),
             self._joins_template(),
             self._measures_template(),
+            self._pre_aggregations_template(),
         ]
         return "".join(template_parts)
 
+    def generate_stub(self) -> str:
+        """
+        Generates a stub calling the shared macro of MACROS_TEMPLATE, which
+        decides which sections to render from the model when Cube renders it.
+
+        Returns:
+            str: The Jinja stub.
+        """
+        return (
+            f"{{% import 'cubes/{MACROS_FILE}' as cube_dbt %}}\n"
+            f"{{{{ cube_dbt.cube('{self.model.name}') }}}}\n"
+        )
+
+
+class GenerationReport:
+    """
+    Summarizes a generation run: which cube files were written, which were
+    left untouched, and how much time was spent in each phase.
+    """
+
+    PHASES = ("load", "init", "render", "write")
+
+    def __init__(self):
+        self.generated = []
+        self.unchanged = []
+        self.timings = {phase: 0.0 for phase in self.PHASES}
+
+    def add_timing(self, phase: str, seconds: float) -> None:
+        self.timings[phase] += seconds
+
+    def summary(self) -> str:
+        """
+        Returns a human-readable summary with a per-phase timing breakdown.
+
+        Render and write timings are summed over all models, so with several
+        workers they may exceed the wall-clock time of the run.
+        """
+        lines = [
+            f"Generated {len(self.generated)} cube(s), {len(self.unchanged)} unchanged"
+        ]
+        for phase in self.PHASES:
+            lines.append(f"  {phase:<8}{self.timings[phase] * 1000:>10.1f} ms")
+        lines.append(f"  {'total':<8}{sum(self.timings.values()) * 1000:>10.1f} ms")
+        return "\n".join(lines)
+
 
 class CubeGenerator:
     def __init__(self, Dbt: Dbt, schema_path: str):
         self.dbt = Dbt
         self.schema_path = schema_path
 
-    def generate_cubes(self):
-        for model in self.dbt.models:
-            cube = CubeYaml(model=model)
+    @property
+    def cubes_path(self) -> str:
+        return f"{self.schema_path}/cubes"
 
-            # Instantiate template
-            template = cube.generate_template()
+    def _render(self, model: Model, macros: bool = False) -> tuple:
+        start = time.perf_counter()
+        cube_yaml = CubeYaml(model=model)
+        template = cube_yaml.generate_stub() if macros else cube_yaml.generate_template()
+        return template, time.perf_counter() - start
 
-            # If path does not exist, create it
-            if not os.path.exists(f"{self.schema_path}/cubes"):
-                os.makedirs(f"{self.schema_path}/cubes")
+    def _write(self, model: Model, template: str, incremental: bool) -> tuple:
+        """
+        Writes the template of a model, returning whether the file was written.
+        In incremental mode, files whose content is already up to date are skipped.
+        """
+        return self._write_file(f"{model.name}.yml.jinja", template, incremental)
 
-            with open(f"{self.schema_path}/cubes/{model.name}.yml.jinja", "w") as f:
+    def _write_file(self, name: str, template: str, incremental: bool) -> tuple:
+        start = time.perf_counter()
+        path = f"{self.cubes_path}/{name}"
+        written = True
+        if incremental and os.path.exists(path):
+            with open(path, "r") as f:
+                written = f.read() != template
+        if written:
+            with open(path, "w") as f:
                 f.write(template)
-                f.close()
-                print(f"Generated cube YAML for {model.name}")
+        return written, time.perf_counter() - start
+
+    def _generate_cube(
+        self, model: Model, incremental: bool, digest: bool, macros: bool = False
+    ) -> tuple:
+        template, render_time = self._render(model, macros)
+        written, write_time = self._write(model, template, incremental)
+        template_digest = (
+            hashlib.sha256(template.encode("utf-8")).hexdigest() if digest else None
+        )
+        return model, written, render_time, write_time, template_digest
+
+    def _generate_bundle(
+        self,
+        models,
+        bundle_path: str,
+        workers: int,
+        verbose: bool,
+        report: GenerationReport,
+        macros: bool = False,
+    ) -> None:
+        """
+        Writes the templates of all models into a single bundle, in model order,
+        while they are rendered by the workers.
+        """
+        rendered = _map_in_order(
+            lambda model: (model,) + self._render(model, macros), models, workers
+        )
+        with BundleWriter(bundle_path) as bundle:
+            if macros:
+                bundle.add(MACROS_FILE, MACROS_TEMPLATE)
+            for model, template, render_time in rendered:
+                report.add_timing("render", render_time)
+                start = time.perf_counter()
+                bundle.add(f"{model.name}.yml.jinja", template)
+                report.add_timing("write", time.perf_counter() - start)
+                report.generated.append(model.name)
+                if verbose:
+                    print(f"Generated cube YAML for {model.name}")
+
+    @staticmethod
+    def _timed_models(models, report: GenerationReport):
+        """
+        Yields streamed models, counting the time spent building them as init.
+        """
+        iterator = iter(models)
+        while True:
+            start = time.perf_counter()
+            model = next(iterator, None)
+            report.add_timing("init", time.perf_counter() - start)
+            if model is None:
+                return
+            yield model
+
+    def remove_cubes(self, names: list[str]) -> None:
+        """
+        Removes the templates of the given models, e.g. after they were dropped from the manifest.
+        """
+        for name in names:
+            path = f"{self.cubes_path}/{name}.yml.jinja"
+            if os.path.exists(path):
+                os.remove(path)
+
+    def generate_cubes(
+        self,
+        workers: int = 1,
+        incremental: bool = False,
+        verbose: bool = True,
+        models: list[Model] = None,
+        shard_index: int = None,
+        shard_count: int = None,
+        bundle: str = None,
+        macros: bool = False,
+    ) -> GenerationReport:
+        """
+        Generates a cube YAML Jinja template for every model.
+
+        Args:
+            workers (int, optional): Number of threads rendering and writing templates.
+            incremental (bool, optional): Only rewrite files whose content has changed.
+            verbose (bool, optional): Print a line for every generated cube.
+            models (list[Model], optional): Only generate templates for these models instead of all models.
+                If not specified and the models of the Dbt are not loaded yet, they are streamed with
+                Dbt.iter_models, so memory is bounded by the largest model rather than the project.
+            shard_index (int, optional): Only generate the models of this shard, from 0 to shard_count - 1.
+            shard_count (int, optional): Number of shards the models are deterministically split into,
+                e.g. across CI nodes. Each shard records its output for cube_dbt.shard.merge_shards.
+            bundle (str, optional): Write all templates into this single .zip, .tar or .yml bundle,
+                with an index of offsets for cube_dbt.bundle.extract, instead of one file per model.
+            macros (bool, optional): Write one shared macro file and a small stub per model calling it,
+                so that Cube compiles a single full template instead of one per model.
+
+        Returns:
+            GenerationReport: Generated files and per-phase timings.
+        """
+        report = GenerationReport()
+
+        start = time.perf_counter()
+        sharded = shard_count is not None
+        if models is None and self.dbt._models is None:
+            models = self._timed_models(
+                iter_shard_models(self.dbt, shard_index, shard_count)
+                if sharded
+                else self.dbt.iter_models(),
+                report,
+            )
+        else:
+            if models is None:
+                models = self.dbt.models
+            if sharded:
+                models = shard_models(models, shard_index, shard_count)
+        report.add_timing("init", time.perf_counter() - start)
+
+        if bundle is not None:
+            if incremental or sharded:
+                raise ValueError(
+                    "Bundles are always written in full and cannot be combined with incremental or sharded generation"
+                )
+            self._generate_bundle(models, bundle, workers, verbose, report, macros)
+            return report
+
+        # If path does not exist, create it
+        if not os.path.exists(self.cubes_path):
+            os.makedirs(self.cubes_path)
+
+        if macros:
+            _, write_time = self._write_file(MACROS_FILE, MACROS_TEMPLATE, incremental)
+            report.add_timing("write", write_time)
+
+        results = _map_in_order(
+            lambda model: self._generate_cube(model, incremental, sharded, macros),
+            models,
+            workers,
+        )
+
+        files = {}
+        for model, written, render_time, write_time, digest in results:
+            report.add_timing("render", render_time)
+            report.add_timing("write", write_time)
+            if written:
+                report.generated.append(model.name)
+                if verbose:
+                    print(f"Generated cube YAML for {model.name}")
+            else:
+                report.unchanged.append(model.name)
+            if sharded:
+                files[model.unique_id] = (f"{model.name}.yml.jinja", digest)
+
+        if sharded:
+            shared = {}
+            if macros:
+                shared[MACROS_FILE] = hashlib.sha256(
+                    MACROS_TEMPLATE.encode("utf-8")
+                ).hexdigest()
+            write_record(self.schema_path, shard_index, shard_count, files, shared)
+
+        return report
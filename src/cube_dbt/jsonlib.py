@@ -0,0 +1,126 @@
+"""
+JSON parsing backends for manifest files.
+
+The fastest installed backend is used by default: orjson, then simdjson, then
+the standard library. All backends accept bytes, so files can be parsed without
+decoding them to str first. Serialization uses orjson if it is selected, and
+the standard library otherwise.
+"""
+
+BACKENDS = ("orjson", "simdjson", "json")
+
+_backend = None
+
+
+def _orjson_loads(data):
+    import orjson
+
+    return orjson.loads(data)
+
+
+def _simdjson_loads(data):
+    import simdjson
+
+    if isinstance(data, bytearray):
+        data = bytes(data)
+    return simdjson.loads(data)
+
+
+def _json_loads(data):
+    import json
+
+    return json.loads(data)
+
+
+def _orjson_dumps(data) -> bytes:
+    import orjson
+
+    return orjson.dumps(data)
+
+
+def _json_dumps(data) -> bytes:
+    import json
+
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_LOADS = {
+    "orjson": _orjson_loads,
+    "simdjson": _simdjson_loads,
+    "json": _json_loads,
+}
+
+# simdjson only parses, its dumps is the standard library one
+_DUMPS = {
+    "orjson": _orjson_dumps,
+    "simdjson": _json_dumps,
+    "json": _json_dumps,
+}
+
+
+def _is_available(name: str) -> bool:
+    if name == "json":
+        return True
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends() -> list[str]:
+    return list(name for name in BACKENDS if _is_available(name))
+
+
+def get_backend() -> str:
+    """
+    Returns the name of the backend in use, detecting the fastest installed one on first use.
+    """
+    global _backend
+    if _backend is None:
+        _backend = available_backends()[0]
+    return _backend
+
+
+def set_backend(name: str = None) -> None:
+    """
+    Selects the backend used to parse manifests.
+
+    Args:
+        name (str, optional): One of 'orjson', 'simdjson' or 'json'. Detects the fastest installed backend if not specified.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the backend is not installed.
+    """
+    global _backend
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(
+                f"Unknown JSON backend: {name}, expected one of {', '.join(BACKENDS)}"
+            )
+        if not _is_available(name):
+            raise ImportError(f"JSON backend {name} is not installed")
+    _backend = name
+
+
+def loads(data: bytes or bytearray or str, backend: str = None):
+    """
+    Parses a JSON document from bytes, bytearray or str.
+
+    Args:
+        data (bytes, bytearray or str): The JSON document. Bytes are parsed as UTF-8 without an intermediate str copy.
+        backend (str, optional): The backend to use instead of the selected one.
+    """
+    return _LOADS[backend or get_backend()](data)
+
+
+def dumps(data, backend: str = None) -> bytes:
+    """
+    Serializes data to compact UTF-8 encoded JSON.
+
+    Args:
+        data: Dicts, lists, strings, numbers, booleans and None.
+        backend (str, optional): The backend to use instead of the selected one.
+    """
+    return _DUMPS[backend or get_backend()](data)
@@ -0,0 +1,124 @@
+"""
+Lineage-based model selection over the parent_map and child_map of a manifest.
+
+Selectors follow the dbt graph operator syntax:
+
+    orders          the model named orders
+    +orders         orders and all of its ancestors
+    2+orders        orders and its ancestors up to two levels up
+    orders+         orders and all of its descendants
+    +exposure:dash  the models feeding the dash exposure, and their ancestors
+"""
+
+import re
+from collections import deque
+
+_SELECTOR = re.compile(r"^(?:(\d*)(\+))?([^+]+?)(?:(\+)(\d*))?$")
+
+
+class LineageGraph:
+    """
+    The dependency graph of a manifest, with unique_ids mapped to integers
+    and parents/children stored as integer adjacency lists.
+    """
+
+    def __init__(self, parent_map: dict, child_map: dict) -> None:
+        self.ids = []
+        self._index = {}
+        for edges in (parent_map, child_map):
+            for unique_id, neighbors in edges.items():
+                self._intern(unique_id)
+                for neighbor in neighbors:
+                    self._intern(neighbor)
+        self.parents = self._adjacency(parent_map)
+        self.children = self._adjacency(child_map)
+
+    @staticmethod
+    def from_manifest(manifest: dict) -> "LineageGraph":
+        return LineageGraph(manifest.get("parent_map", {}), manifest.get("child_map", {}))
+
+    def _intern(self, unique_id: str) -> int:
+        index = self._index.get(unique_id)
+        if index is None:
+            index = self._index[unique_id] = len(self.ids)
+            self.ids.append(unique_id)
+        return index
+
+    def _adjacency(self, edges: dict) -> list:
+        adjacency = [[] for _ in self.ids]
+        for unique_id, neighbors in edges.items():
+            adjacency[self._index[unique_id]] = list(
+                self._index[neighbor] for neighbor in neighbors
+            )
+        return adjacency
+
+    def walk(self, unique_ids: list[str], upstream: bool, depth: int = None) -> set:
+        """
+        Breadth-first search from the given nodes.
+
+        Args:
+            unique_ids (list[str]): Nodes to start from, included in the result.
+            upstream (bool): Follow parents if True, children otherwise.
+            depth (int, optional): Maximum number of levels, unlimited if not specified.
+
+        Returns:
+            set: unique_ids of the reached nodes.
+        """
+        adjacency = self.parents if upstream else self.children
+        starts = list(self._index[unique_id] for unique_id in unique_ids if unique_id in self._index)
+        seen = set(starts)
+        queue = deque((index, 0) for index in starts)
+        while queue:
+            index, level = queue.popleft()
+            if depth is not None and level >= depth:
+                continue
+            for neighbor in adjacency[index]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append((neighbor, level + 1))
+        return set(self.ids[index] for index in seen) | set(unique_ids)
+
+
+def _resolve(manifest: dict, value: str) -> list[str]:
+    if value.startswith("exposure:"):
+        name = value[len("exposure:") :]
+        return list(
+            unique_id
+            for unique_id, exposure in manifest.get("exposures", {}).items()
+            if exposure["name"] == name
+        )
+    if value in manifest["nodes"]:
+        return [value]
+    return list(
+        unique_id
+        for unique_id, node in manifest["nodes"].items()
+        if node.get("name") == value
+    )
+
+
+def select(manifest: dict, selectors: list[str], graph: LineageGraph = None) -> set:
+    """
+    Returns the unique_ids selected by any of the selectors.
+
+    Raises:
+        ValueError: If a selector is malformed or matches no node.
+    """
+    if graph is None:
+        graph = LineageGraph.from_manifest(manifest)
+
+    selected = set()
+    for selector in selectors:
+        match = _SELECTOR.match(selector.strip())
+        if match is None:
+            raise ValueError(f"Invalid selector: {selector}")
+        parents_depth, parents, value, children, children_depth = match.groups()
+
+        seeds = _resolve(manifest, value)
+        if not seeds:
+            raise ValueError(f"Selector matches no node: {selector}")
+        selected.update(seeds)
+        if parents:
+            selected |= graph.walk(seeds, True, int(parents_depth) if parents_depth else None)
+        if children:
+            selected |= graph.walk(seeds, False, int(children_depth) if children_depth else None)
+    return selected
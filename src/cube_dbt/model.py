@@ -1,9 +1,17 @@
 from cube_dbt.column import Column
 from cube_dbt.dump import SafeString, dump
 from cube_dbt.measure import Measure
+from cube_dbt.selector import selector
 from cube_dbt.test import Test
 
 
+# Time-based refresh of views, which always reflect the current upstream data
+VIEW_REFRESH_INTERVAL = "1 hour"
+
+
+def _member_reference(name: str) -> str:
+    return name if "." in name else f"CUBE.{name}"
+
 
 class Model:
     def __init__(self, model_dict: dict) -> None:
@@ -12,6 +20,11 @@ class Model:
         self._measures = None
         self._primary_key = None
         self._tests = []
+        self._run_result = None
+        self._catalog_node = None
+        self._catalog_columns = None
+        self._fingerprint = None
+        self._sections = None
         pass
 
     def __repr__(self) -> str:
@@ -20,7 +33,7 @@ class Model:
     def _init_columns(self) -> None:
         if self._columns == None:
             self._columns = list(
-                Column(self.name, column)
+                Column(self.name, column, self.catalog_column(column["name"]))
                 for key, column in self._model_dict["columns"].items()
             )
             self._detect_primary_key()
@@ -48,6 +61,131 @@ class Model:
 
     def add_test(self, test: "Test") -> None:
         self._tests.append(test)
+        self._fingerprint = None
+        self._sections = None
+
+    def set_run_result(self, run_result: dict or None) -> None:
+        self._run_result = run_result
+        self._fingerprint = None
+        self._sections = None
+
+    def set_catalog_node(self, catalog_node: dict or None) -> None:
+        self._catalog_node = catalog_node
+        self._catalog_columns = None
+        self._columns = None
+        self._fingerprint = None
+        self._sections = None
+
+    def _rebind(self, model_dict: dict, test_dicts: list) -> None:
+        """
+        Points the model, its initialized columns and measures and its tests at
+        equal dicts of a new manifest, so the old one can be freed.
+        """
+        if self._columns is not None:
+            # Columns were built in the order of the old dict, rebind them by key
+            for column, key in zip(self._columns, self._model_dict["columns"]):
+                column._column_dict = model_dict["columns"][key]
+        self._model_dict = model_dict
+        if self._measures:
+            for measure, measure_dict in zip(self._measures, model_dict["meta"]["measures"]):
+                measure._measure_dict = measure_dict
+        for test, test_dict in zip(self._tests, test_dicts):
+            test._test_dict = test_dict
+
+    def catalog_column(self, name: str) -> dict or None:
+        """
+        The catalog.json entry of a column, if a catalog was loaded. Warehouses may
+        report column names in another case, e.g. Snowflake, so names are matched
+        case-insensitively.
+        """
+        if self._catalog_node is None:
+            return None
+        if self._catalog_columns is None:
+            self._catalog_columns = {
+                key.lower(): column
+                for key, column in self._catalog_node.get("columns", {}).items()
+            }
+        return self._catalog_columns.get(name.lower())
+
+    def _catalog_stat(self, *ids: str):
+        if self._catalog_node is None:
+            return None
+        stats = self._catalog_node.get("stats", {})
+        for id in ids:
+            stat = stats.get(id)
+            if stat is not None and stat.get("include", True):
+                return stat.get("value")
+        return None
+
+    @property
+    def row_count(self) -> int or None:
+        """
+        Number of rows of the table from catalog.json, if the warehouse reports it
+        """
+        return self._catalog_stat("row_count", "num_rows")
+
+    @property
+    def bytes(self) -> int or None:
+        """
+        Size of the table in bytes from catalog.json, if the warehouse reports it
+        """
+        return self._catalog_stat("bytes", "num_bytes")
+
+    def fingerprint(self) -> str:
+        """
+        Digest of the properties of the model that affect its generated cube:
+        name, relation, columns, measures, pre-aggregations, refresh key inputs
+        and relationship tests. Computed once and reused until tests, run
+        results or the catalog of the model change.
+        """
+        if self._fingerprint is None:
+            import hashlib
+            import json
+
+            model_dict = self._model_dict
+            meta = model_dict.get("meta", {})
+            config = model_dict.get("config", {})
+            data = [
+                model_dict.get("name"),
+                model_dict.get("description"),
+                model_dict.get("relation_name"),
+                model_dict.get("database"),
+                model_dict.get("schema"),
+                model_dict.get("alias"),
+                list(
+                    [
+                        column.get("name"),
+                        column.get("description"),
+                        column.get("data_type")
+                        or (self.catalog_column(column["name"]) or {}).get("type"),
+                        column.get("tags"),
+                        column.get("meta"),
+                    ]
+                    for column in model_dict.get("columns", {}).values()
+                ),
+                meta.get("measures"),
+                meta.get("pre_aggregations"),
+                meta.get("refresh_key"),
+                config.get("materialized"),
+                config.get("partition_by"),
+                list(
+                    [
+                        test._test_dict.get("tags"),
+                        test._test_dict.get("refs"),
+                        test.kwargs,
+                    ]
+                    for test in self._tests
+                ),
+                self.built_at,
+            ]
+            self._fingerprint = hashlib.sha256(
+                json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+        return self._fingerprint
+
+    @property
+    def unique_id(self) -> str:
+        return self._model_dict["unique_id"]
 
     @property
     def name(self) -> str:
@@ -71,6 +209,35 @@ class Model:
             )
             return f"`{database}`.`{schema}`.`{name}`"
 
+    @property
+    def materialized(self) -> str or None:
+        return self._model_dict.get("config", {}).get("materialized")
+
+    @property
+    def built_at(self) -> str or None:
+        """
+        Completion time of the last successful build, if run results were loaded
+        """
+        if self._run_result is None:
+            return None
+        for timing in self._run_result.get("timing", []):
+            if timing["name"] == "execute" and timing.get("completed_at"):
+                return timing["completed_at"]
+        return None
+
+    @property
+    def partition_granularity(self) -> str or None:
+        """
+        Convention: time partitioning from the partition_by config of the model,
+        e.g. { field: 'created_at', data_type: 'timestamp', granularity: 'day' }
+        """
+        partition_by = self._model_dict.get("config", {}).get("partition_by")
+        if not isinstance(partition_by, dict):
+            return None
+        if partition_by.get("data_type", "date") not in ("date", "datetime", "timestamp"):
+            return None
+        return partition_by.get("granularity", "day")
+
     @property
     def columns(self) -> list[Column]:
         self._init_columns()
@@ -102,6 +269,38 @@ class Model:
         self._init_tests()
         return next(test for test in self._tests if test.name == name)
 
+    def _init_sections(self) -> None:
+        # Which optional cube sections the model renders, computed once for the
+        # shared macro template, which checks them for every model at render time
+        if self._sections is None:
+            self._sections = {
+                "refresh_key": bool(self._as_refresh_key()),
+                "dimensions": len(self.columns) > 0,
+                "joins": any(test._as_join() for test in self.tests),
+                "measures": len(self.measures) > 0,
+                "pre_aggregations": len(self._as_pre_aggregations()) > 0,
+            }
+
+    def has_refresh_key(self) -> bool:
+        self._init_sections()
+        return self._sections["refresh_key"]
+
+    def has_dimensions(self) -> bool:
+        self._init_sections()
+        return self._sections["dimensions"]
+
+    def has_joins(self) -> bool:
+        self._init_sections()
+        return self._sections["joins"]
+
+    def has_measures(self) -> bool:
+        self._init_sections()
+        return self._sections["measures"]
+
+    def has_pre_aggregations(self) -> bool:
+        self._init_sections()
+        return self._sections["pre_aggregations"]
+
     def _as_cube(self) -> dict:
         data = {}
         data["name"] = self.name
@@ -117,44 +316,228 @@ class Model:
         """
         return dump(self._as_cube(), indent=4)
 
-    def _as_dimensions(self, skip: list[str] = []) -> list:
+    def to_cube_dict(self) -> dict:
+        """
+        Returns the cube of the model as a dict, with the same sections as its
+        generated template, for programmatic consumers that would otherwise
+        parse the YAML. meta dicts are shared with the manifest, not copied.
+        """
+        cube = self._as_cube()
+        refresh_key = self._as_refresh_key()
+        if refresh_key:
+            cube["refresh_key"] = refresh_key
+        for key, members in (
+            ("dimensions", self._as_dimensions()),
+            ("joins", self._as_joins()),
+            ("measures", self._as_measures()),
+            ("pre_aggregations", self._as_pre_aggregations()),
+        ):
+            members = list(member for member in members if member)
+            if members:
+                cube[key] = members
+        return cube
+
+    def _as_refresh_key(self) -> dict:
+        """
+        Convention: the 'refresh_key' meta of the model is used as-is. Otherwise the
+        refresh key is tied to the last successful build from run results. Without
+        them, views are refreshed on a time basis, and other models keep Cube's
+        default refresh key, as a query on the table would scan it on every check.
+        """
+        refresh_key = self._model_dict.get("meta", {}).get("refresh_key")
+        if refresh_key is not None:
+            return refresh_key
+
+        built_at = self.built_at
+        if built_at is not None:
+            return {"sql": f"SELECT '{built_at}'"}
+
+        if self.materialized == "view":
+            return {"every": VIEW_REFRESH_INTERVAL}
+        return {}
+
+    def as_refresh_key(self) -> str:
+        """
+        For use in Jinja:
+        {{ dbt.model('name').as_refresh_key() }}
+        """
+        refresh_key = self._as_refresh_key()
+        return dump(refresh_key, indent=6) if refresh_key else SafeString("")
+
+    def _pre_aggregation_time_dimension(self) -> Column or None:
+        partition_by = self._model_dict.get("config", {}).get("partition_by")
+        if isinstance(partition_by, dict) and "field" in partition_by:
+            column = next(
+                (column for column in self.columns if column.name == partition_by["field"]),
+                None,
+            )
+            if column is not None and column.type == "time":
+                return column
+        return next((column for column in self.columns if column.type == "time"), None)
+
+    def _as_pre_aggregation(self, pre_aggregation: dict) -> dict:
+        data = {}
+        data["name"] = pre_aggregation["name"]
+        data["type"] = pre_aggregation.get("type", "rollup")
+        if data["type"] == "rollup":
+            measures = pre_aggregation.get(
+                "measures", list(measure.name for measure in self.measures)
+            )
+            if measures:
+                data["measures"] = list(_member_reference(name) for name in measures)
+            dimensions = pre_aggregation.get("dimensions", [])
+            if dimensions:
+                data["dimensions"] = list(_member_reference(name) for name in dimensions)
+
+            time_dimension = pre_aggregation.get("time_dimension")
+            if time_dimension is None:
+                column = self._pre_aggregation_time_dimension()
+                time_dimension = column.name if column is not None else None
+            if time_dimension is not None:
+                partition_granularity = pre_aggregation.get(
+                    "partition_granularity", self.partition_granularity
+                )
+                data["time_dimension"] = _member_reference(time_dimension)
+                data["granularity"] = pre_aggregation.get(
+                    "granularity", "hour" if partition_granularity == "hour" else "day"
+                )
+                if partition_granularity:
+                    data["partition_granularity"] = partition_granularity
+
+        # Rollup members were converted above, or left out when empty. Other
+        # types, e.g. original_sql, get all their keys as written
+        consumed = (
+            ("measures", "dimensions", "time_dimension") if data["type"] == "rollup" else ()
+        )
+        for key, value in pre_aggregation.items():
+            if key not in data and key not in consumed:
+                data[key] = value
+        return data
+
+    def _as_pre_aggregations(self) -> list:
+        """
+        Convention: pre-aggregations are read from the 'pre_aggregations' meta of the model.
+        Without it, a model with measures and a time column gets a single rollup of all
+        measures by that column, partitioned like the model.
+        """
+        pre_aggregations = self._model_dict.get("meta", {}).get("pre_aggregations")
+        if pre_aggregations is not None:
+            return list(
+                self._as_pre_aggregation(pre_aggregation)
+                for pre_aggregation in pre_aggregations
+            )
+
+        if not self.measures or self._pre_aggregation_time_dimension() is None:
+            return []
+        return [self._as_pre_aggregation({"name": "rollup"})]
+
+    def as_pre_aggregations(self) -> str:
+        """
+        For use in Jinja:
+        {{ dbt.model('name').as_pre_aggregations() }}
+        """
+        pre_aggregations = self._as_pre_aggregations()
+        return dump(pre_aggregations, indent=6) if pre_aggregations else SafeString("")
+
+    def _as_dimensions(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        types: list[str] = [],
+        tags: list[str] = [],
+    ) -> list:
+        select = selector(include, list(skip) + list(exclude), types, tags)
         return list(
-            column._as_dimension() for column in self.columns if column.name not in skip
+            column._as_dimension()
+            for column in self.columns
+            if select.matches(
+                column.name,
+                column.type if select.types else None,
+                column.tags if select.tags else (),
+            )
         )
 
-    def as_dimensions(self, skip: list[str] = []) -> str:
+    def as_dimensions(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        types: list[str] = [],
+        tags: list[str] = [],
+    ) -> str:
         """
         For use in Jinja:
         {{ dbt.model('name').as_dimensions(skip=['id']) }}
+        {{ dbt.model('name').as_dimensions(include=['*_at'], exclude=['re:^_.*'], types=['time']) }}
         """
-        dimensions = self._as_dimensions(skip)
+        dimensions = self._as_dimensions(skip, include, exclude, types, tags)
         return dump(dimensions, indent=6) if dimensions else SafeString("")
 
     def add_test(self, test) -> None:
         self._tests.append(test)
+        self._fingerprint = None
+        self._sections = None
 
     @property
     def tests(self) -> list:
         return self._tests
 
-    def _as_joins(self) -> list:
-        return list(test._as_join() for test in self.tests)
+    def _as_joins(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        tags: list[str] = [],
+    ) -> list:
+        select = selector(include, list(skip) + list(exclude), (), tags)
+        joins = []
+        for test in self.tests:
+            join = test._as_join()
+            if not join or select.matches(
+                join["name"], None, test.tags if select.tags else ()
+            ):
+                joins.append(join)
+        return joins
 
-    def as_joins(self) -> str:
+    def as_joins(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        tags: list[str] = [],
+    ) -> str:
         """
         For use in Jinja:
         {{ dbt.model('name').as_joins(skip=['id']) }}
         """
-        joins = self._as_joins()
+        joins = self._as_joins(skip, include, exclude, tags)
         return dump(joins, indent=6) if joins else SafeString("")
 
-    def _as_measures(self) -> list:
-        return list(measure._as_measure() for measure in self.measures)
+    def _as_measures(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        types: list[str] = [],
+    ) -> list:
+        select = selector(include, list(skip) + list(exclude), types)
+        return list(
+            measure._as_measure()
+            for measure in self.measures
+            if select.matches(measure.name, measure.type if select.types else None)
+        )
 
-    def as_measures(self) -> str:
+    def as_measures(
+        self,
+        skip: list[str] = [],
+        include: list = [],
+        exclude: list = [],
+        types: list[str] = [],
+    ) -> str:
         """
         For use in Jinja:
         {{ dbt.model('name').as_measures(skip=['id']) }}
         """
-        measures = self._as_measures()
+        measures = self._as_measures(skip, include, exclude, types)
         return dump(measures, indent=6) if measures else SafeString("")
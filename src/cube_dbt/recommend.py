@@ -0,0 +1,295 @@
+"""
+Pre-aggregation recommendations from Cube query logs.
+
+A query log is a JSON lines file, optionally gzip- or zstd-compressed, with one
+Cube query per line, either as the line itself or under a 'query' key next to
+its duration in milliseconds:
+
+    {"query": {"measures": ["orders.count"], "timeDimensions": [...]}, "duration": 1250}
+
+The members used by each query are mapped back to the models, columns and
+measures of a Dbt, and the most frequent and slowest combinations are turned
+into rollup definitions.
+"""
+
+import io
+
+from cube_dbt import compression, jsonlib
+from cube_dbt.dbt import Dbt
+from cube_dbt.dump import dump
+from cube_dbt.model import Model
+
+DURATION_KEYS = ("duration", "durationMs", "duration_ms", "latency", "elapsed")
+
+
+class QueryPattern:
+    """
+    A combination of members of one model used by queries, with usage statistics.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        measures: tuple,
+        dimensions: tuple,
+        time_dimension: str = None,
+        granularity: str = None,
+    ) -> None:
+        self.model = model
+        self.measure_names = measures
+        self.dimension_names = dimensions
+        self.time_dimension_name = time_dimension
+        self.granularity = granularity
+        self.count = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"QueryPattern({self.model.name}, measures={list(self.measure_names)}, "
+            f"dimensions={list(self.dimension_names)}, time_dimension={self.time_dimension_name}, "
+            f"granularity={self.granularity}, count={self.count})"
+        )
+
+    @property
+    def measures(self) -> list:
+        return list(self.model.measure(name) for name in self.measure_names)
+
+    @property
+    def dimensions(self) -> list:
+        return list(self.model.column(name) for name in self.dimension_names)
+
+    @property
+    def time_dimension(self):
+        if self.time_dimension_name is None:
+            return None
+        return self.model.column(self.time_dimension_name)
+
+    @property
+    def average_duration(self) -> float:
+        return self.total_duration / self.count if self.count else 0.0
+
+    @property
+    def score(self) -> float:
+        # Total time spent on the pattern, or its frequency if the log has no durations
+        return self.total_duration if self.total_duration else float(self.count)
+
+    def _as_pre_aggregation(self, name: str) -> dict:
+        pre_aggregation = {
+            "name": name,
+            "measures": list(self.measure_names),
+            "dimensions": list(self.dimension_names),
+        }
+        if self.time_dimension_name is None:
+            data = self.model._as_pre_aggregation(pre_aggregation)
+            # The queries don't use a time dimension, so don't add the model's default one
+            for key in ("time_dimension", "granularity", "partition_granularity"):
+                data.pop(key, None)
+            return data
+        pre_aggregation["time_dimension"] = self.time_dimension_name
+        if self.granularity is not None:
+            pre_aggregation["granularity"] = self.granularity
+        return self.model._as_pre_aggregation(pre_aggregation)
+
+
+class QueryLogAnalyzer:
+    """
+    Aggregates query log entries into QueryPatterns in bounded memory.
+
+    At most max_patterns distinct patterns are tracked. When the limit is reached,
+    the less frequent half is dropped, so counts of rare patterns are approximate
+    while the hot ones, which matter for recommendations, are kept.
+    """
+
+    def __init__(self, dbt: Dbt, max_patterns: int = 10000) -> None:
+        self.max_patterns = max_patterns
+        self.queries = 0
+        self.skipped = 0
+        self.unmapped_members = 0
+        self._patterns = {}
+        self._models = {model.name: model for model in dbt.models}
+        self._members = {}
+
+    def _members_of(self, model: Model) -> tuple:
+        members = self._members.get(model.name)
+        if members is None:
+            members = (
+                set(measure.name for measure in model.measures),
+                set(column.name for column in model.columns),
+            )
+            self._members[model.name] = members
+        return members
+
+    def _resolve(self, member: str) -> tuple or None:
+        cube_name, _, name = member.partition(".")
+        model = self._models.get(cube_name)
+        if model is None:
+            return None
+        measures, columns = self._members_of(model)
+        if name in measures:
+            return model, "measure", name
+        if name in columns:
+            return model, "dimension", name
+        return None
+
+    def _prune(self) -> None:
+        patterns = sorted(self._patterns.items(), key=lambda item: -item[1].count)
+        self._patterns = dict(patterns[: self.max_patterns // 2])
+
+    @staticmethod
+    def _member_list(query: dict, key: str) -> list:
+        members = query.get(key, [])
+        if not isinstance(members, list) or not all(
+            isinstance(member, str) for member in members
+        ):
+            raise ValueError(f"Malformed {key} in query: {members!r}")
+        return members
+
+    @staticmethod
+    def _object_list(query: dict, key: str) -> list:
+        objects = query.get(key, [])
+        if not isinstance(objects, list) or not all(
+            isinstance(item, dict) for item in objects
+        ):
+            raise ValueError(f"Malformed {key} in query: {objects!r}")
+        return objects
+
+    def _query_members(self, query: dict) -> list:
+        """
+        Returns (member, kind, granularity) for every member used by a query.
+
+        Raises:
+            ValueError: If the query is malformed.
+        """
+        if not isinstance(query, dict):
+            raise ValueError(f"Query is not an object: {query!r}")
+        members = []
+        for member in self._member_list(query, "measures"):
+            members.append((member, "measure", None))
+        for member in self._member_list(query, "dimensions"):
+            members.append((member, "dimension", None))
+        for time_dimension in self._object_list(query, "timeDimensions"):
+            member = time_dimension.get("dimension")
+            if not isinstance(member, str):
+                raise ValueError(f"Malformed time dimension in query: {time_dimension!r}")
+            members.append((member, "time", time_dimension.get("granularity")))
+        # Filtered members must be in the rollup too
+        for query_filter in self._object_list(query, "filters"):
+            member = query_filter.get("member", query_filter.get("dimension"))
+            if isinstance(member, str):
+                members.append((member, "dimension", None))
+        return members
+
+    def add_query(self, query: dict, duration: float = None) -> None:
+        """
+        Adds one query, split into one pattern per model it uses measures of.
+
+        Raises:
+            ValueError: If the query is malformed, in which case nothing is counted.
+        """
+        members = self._query_members(query)
+        self.queries += 1
+        by_model = {}
+        for member, kind, granularity in members:
+            resolved = self._resolve(member)
+            if resolved is None:
+                self.unmapped_members += 1
+                continue
+            model, member_kind, name = resolved
+            entry = by_model.setdefault(model.name, [model, set(), set(), None, None])
+            if kind == "time" and member_kind == "dimension":
+                entry[3] = name
+                entry[4] = granularity
+            elif member_kind == "measure":
+                entry[1].add(name)
+            else:
+                entry[2].add(name)
+
+        for model, measures, dimensions, time_dimension, granularity in by_model.values():
+            if not measures:
+                continue
+            key = (
+                model.name,
+                tuple(sorted(measures)),
+                tuple(sorted(dimensions)),
+                time_dimension,
+                granularity,
+            )
+            pattern = self._patterns.get(key)
+            if pattern is None:
+                if len(self._patterns) >= self.max_patterns:
+                    self._prune()
+                pattern = self._patterns[key] = QueryPattern(model, *key[1:])
+            pattern.count += 1
+            if duration is not None:
+                pattern.total_duration += duration
+                pattern.max_duration = max(pattern.max_duration, duration)
+
+    def add_entry(self, entry: dict) -> None:
+        """
+        Adds one query log entry, either a query or an object with the query
+        under 'query' and its duration.
+
+        Raises:
+            ValueError: If the entry is malformed, in which case nothing is counted.
+        """
+        if not isinstance(entry, dict):
+            raise ValueError(f"Query log entry is not an object: {entry!r}")
+        query = entry.get("query", entry)
+        if isinstance(query, str):
+            query = jsonlib.loads(query)
+        duration = next(
+            (entry[key] for key in DURATION_KEYS if entry.get(key) is not None), None
+        )
+        if duration is not None:
+            try:
+                duration = float(duration)
+            except (TypeError, ValueError):
+                raise ValueError(f"Malformed duration in query log entry: {duration!r}")
+        self.add_query(query, duration)
+
+    def read(self, log_path: str) -> "QueryLogAnalyzer":
+        """
+        Streams a query log file line by line, skipping and counting in skipped
+        the lines that can't be parsed or don't hold a well-formed query.
+
+        Returns:
+            QueryLogAnalyzer: This instance, for chaining.
+        """
+        with open(log_path, "rb") as file:
+            lines = compression.open_stream(file)
+            if not isinstance(lines, io.BufferedIOBase):
+                lines = io.BufferedReader(lines)
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    self.add_entry(jsonlib.loads(line))
+                except ValueError:
+                    self.skipped += 1
+        return self
+
+    def top(self, count: int = 10) -> list[QueryPattern]:
+        """
+        Returns the patterns with the highest total duration, or frequency if
+        the log has no durations.
+        """
+        return sorted(self._patterns.values(), key=lambda pattern: -pattern.score)[:count]
+
+    def _as_cubes(self, count: int = 10) -> list:
+        cubes = {}
+        for pattern in self.top(count):
+            pre_aggregations = cubes.setdefault(pattern.model.name, [])
+            pre_aggregations.append(
+                pattern._as_pre_aggregation(f"recommended_{len(pre_aggregations) + 1}")
+            )
+        return list(
+            {"name": name, "pre_aggregations": pre_aggregations}
+            for name, pre_aggregations in cubes.items()
+        )
+
+    def as_cubes(self, count: int = 10) -> str:
+        """
+        Returns the recommended rollups of the top patterns as cube YAML.
+        """
+        return dump({"cubes": self._as_cubes(count)})
@@ -0,0 +1,85 @@
+from functools import lru_cache
+
+REGEX_PREFIX = "re:"
+GLOB_CHARACTERS = frozenset("*?[")
+
+
+def _compile_patterns(patterns: tuple) -> tuple:
+    """
+    Splits patterns into a set of exact names and a single compiled regex
+    covering all globs and regexes, or None if there are none.
+    """
+    import fnmatch
+    import re
+
+    names = set()
+    regexes = []
+    for pattern in patterns:
+        if isinstance(pattern, re.Pattern):
+            regexes.append(pattern.pattern)
+        elif pattern.startswith(REGEX_PREFIX):
+            regexes.append(pattern[len(REGEX_PREFIX) :])
+        elif GLOB_CHARACTERS.intersection(pattern):
+            regexes.append(fnmatch.translate(pattern))
+        else:
+            names.add(pattern)
+    regex = (
+        re.compile("|".join(f"(?:{regex})" for regex in regexes)) if regexes else None
+    )
+    return frozenset(names), regex
+
+
+class Selector:
+    """
+    Matches members (columns, measures or joins) by name, type and tags.
+
+    Name patterns can be exact names, globs ('*_id') or regexes, either prefixed
+    with 're:' ('re:^_.*') or passed as compiled patterns. Regexes must match
+    the whole name.
+    """
+
+    def __init__(
+        self, include: tuple, exclude: tuple, types: tuple, tags: tuple
+    ) -> None:
+        self._include = include
+        self._include_names, self._include_regex = _compile_patterns(include)
+        self._exclude_names, self._exclude_regex = _compile_patterns(exclude)
+        self.types = frozenset(types)
+        self.tags = frozenset(tags)
+
+    @staticmethod
+    def _matches_name(name: str, names: frozenset, regex) -> bool:
+        return name in names or (regex is not None and regex.fullmatch(name) is not None)
+
+    def matches(self, name: str, type: str = None, tags: list = ()) -> bool:
+        """
+        Args:
+            name (str): Name of the member.
+            type (str, optional): Type of the member, only needed if the selector filters by types.
+            tags (list, optional): Tags of the member, only needed if the selector filters by tags.
+        """
+        if self._include and not self._matches_name(
+            name, self._include_names, self._include_regex
+        ):
+            return False
+        if self._matches_name(name, self._exclude_names, self._exclude_regex):
+            return False
+        if self.types and type not in self.types:
+            return False
+        if self.tags and self.tags.isdisjoint(tags):
+            return False
+        return True
+
+
+@lru_cache(maxsize=256)
+def _cached_selector(include: tuple, exclude: tuple, types: tuple, tags: tuple):
+    return Selector(include, exclude, types, tags)
+
+
+def selector(
+    include: list = (), exclude: list = (), types: list = (), tags: list = ()
+) -> Selector:
+    """
+    Returns a Selector, compiled once per distinct combination of arguments.
+    """
+    return _cached_selector(tuple(include), tuple(exclude), tuple(types), tuple(tags))
@@ -0,0 +1,248 @@
+"""
+Deterministic sharding of cube generation across CI nodes.
+
+Every node loads the same manifest and computes the same assignment of models
+to shards, so no coordination is needed. Each shard records what it generated,
+and merge_shards verifies that the shards together cover every model exactly
+once before combining their outputs.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import shutil
+
+from cube_dbt.dbt import Dbt
+from cube_dbt.model import Model
+
+RECORDS_DIRECTORY = ".cube_dbt"
+
+
+def stable_hash(unique_id: str) -> int:
+    """
+    Hash of a unique_id that, unlike hash(), is the same in every process.
+    """
+    return int.from_bytes(hashlib.sha256(unique_id.encode("utf-8")).digest()[:8], "big")
+
+
+def model_weight(model: Model) -> int:
+    # Rendering cost grows with the number of columns, empty models still cost something
+    return len(model._model_dict.get("columns", {})) + 1
+
+
+def assign_shards(weights: dict, shard_count: int) -> dict:
+    """
+    Assigns items to shards so that the total weight of the shards is balanced.
+
+    Items are placed heaviest first, ties broken by the stable hash of their id,
+    each on the currently lightest shard. The result only depends on the input,
+    so every node computes the same assignment.
+
+    Args:
+        weights (dict): unique_id -> weight.
+        shard_count (int): Number of shards.
+
+    Returns:
+        dict: unique_id -> shard index.
+    """
+    if shard_count < 1:
+        raise ValueError(f"Shard count must be at least 1, got {shard_count}")
+
+    order = sorted(
+        weights, key=lambda unique_id: (-weights[unique_id], stable_hash(unique_id), unique_id)
+    )
+    loads = [(0, index) for index in range(shard_count)]
+    assignment = {}
+    for unique_id in order:
+        load, index = heapq.heappop(loads)
+        assignment[unique_id] = index
+        heapq.heappush(loads, (load + weights[unique_id], index))
+    return assignment
+
+
+def _check_shard_index(shard_index: int, shard_count: int) -> None:
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(
+            f"Shard index must be between 0 and {shard_count - 1}, got {shard_index}"
+        )
+
+
+def shard_assignment(models, shard_count: int) -> dict:
+    """
+    Assigns models to shards by weight, see assign_shards. Only the weights
+    are kept, so models can be passed as a one-pass iterator.
+
+    Returns:
+        dict: unique_id -> shard index.
+    """
+    return assign_shards(
+        {model.unique_id: model_weight(model) for model in models}, shard_count
+    )
+
+
+def shard_models(models: list[Model], shard_index: int, shard_count: int) -> list[Model]:
+    """
+    Returns the models assigned to a shard, in their original order.
+    """
+    _check_shard_index(shard_index, shard_count)
+    assignment = shard_assignment(models, shard_count)
+    return list(model for model in models if assignment[model.unique_id] == shard_index)
+
+
+def iter_shard_models(dbt: Dbt, shard_index: int, shard_count: int):
+    """
+    Yields the models assigned to a shard from Dbt.iter_models, without keeping
+    all models in memory. The manifest is iterated twice: once for the weights,
+    once for the models of the shard.
+    """
+    _check_shard_index(shard_index, shard_count)
+    assignment = shard_assignment(dbt.iter_models(), shard_count)
+    return (
+        model
+        for model in dbt.iter_models()
+        if assignment[model.unique_id] == shard_index
+    )
+
+
+def record_path(schema_path: str, shard_index: int, shard_count: int) -> str:
+    return f"{schema_path}/{RECORDS_DIRECTORY}/shard-{shard_index}-of-{shard_count}.json"
+
+
+def write_record(
+    schema_path: str,
+    shard_index: int,
+    shard_count: int,
+    files: dict,
+    shared: dict = {},
+) -> None:
+    """
+    Records the output of a shard.
+
+    Args:
+        files (dict): unique_id -> (file name, sha256 of its content).
+        shared (dict, optional): file name -> sha256 of files written by every shard, e.g. shared macros.
+    """
+    path = record_path(schema_path, shard_index, shard_count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "files": {
+            unique_id: {"file": file, "sha256": digest}
+            for unique_id, (file, digest) in files.items()
+        },
+        "shared": shared,
+    }
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2, sort_keys=True)
+
+
+def _read_records(shard_path: str) -> list:
+    directory = f"{shard_path}/{RECORDS_DIRECTORY}"
+    if not os.path.isdir(directory):
+        return []
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("shard-") and name.endswith(".json"):
+            with open(f"{directory}/{name}", "r") as f:
+                records.append(json.load(f))
+    return records
+
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def merge_shards(dbt: Dbt, shard_paths: list[str], schema_path: str) -> list[str]:
+    """
+    Verifies that the outputs of all shards together contain exactly one template
+    for every model and no conflicting files, then copies them into schema_path.
+
+    Args:
+        dbt (Dbt): The same, identically filtered, manifest the shards were generated from.
+        shard_paths (list[str]): Schema directories of the shard outputs.
+        schema_path (str): Cube schema directory receiving the merged templates in <schema_path>/cubes.
+
+    Returns:
+        list[str]: Names of the merged template files.
+
+    Raises:
+        RuntimeError: If shards are missing or duplicated, models are missing or generated twice,
+            or two shards produced different files with the same name.
+    """
+    problems = []
+    shard_count = None
+    seen_shards = set()
+    sources = {}  # unique_id -> (shard path, file, digest)
+    files = {}  # file -> (digest, unique_id)
+    shared = {}  # file -> (shard path, digest)
+
+    for shard_path in shard_paths:
+        records = _read_records(shard_path)
+        if not records:
+            problems.append(f"No shard record found in {shard_path}")
+        for record in records:
+            if shard_count is None:
+                shard_count = record["shard_count"]
+            elif record["shard_count"] != shard_count:
+                problems.append(
+                    f"Shard {record['shard_index']} in {shard_path} was generated for "
+                    f"{record['shard_count']} shards instead of {shard_count}"
+                )
+            if record["shard_index"] in seen_shards:
+                problems.append(f"Shard {record['shard_index']} found more than once")
+            seen_shards.add(record["shard_index"])
+
+            for unique_id, entry in record["files"].items():
+                file, digest = entry["file"], entry["sha256"]
+                if unique_id in sources:
+                    problems.append(f"Model {unique_id} generated by more than one shard")
+                sources[unique_id] = (shard_path, file, digest)
+                if file in files and files[file] != (digest, unique_id):
+                    problems.append(
+                        f"Conflicting templates for {file} from {files[file][1]} and {unique_id}"
+                    )
+                files[file] = (digest, unique_id)
+
+            for file, digest in record.get("shared", {}).items():
+                if file in shared and shared[file][1] != digest:
+                    problems.append(f"Shared file {file} differs between shards")
+                shared[file] = (shard_path, digest)
+
+    if shard_count is not None:
+        for index in range(shard_count):
+            if index not in seen_shards:
+                problems.append(f"Shard {index} of {shard_count} is missing")
+
+    expected = set(model.unique_id for model in dbt.models)
+    for unique_id in sorted(expected - set(sources)):
+        problems.append(f"Model {unique_id} is missing from the shard outputs")
+    for unique_id in sorted(set(sources) - expected):
+        problems.append(f"Model {unique_id} is not part of the manifest")
+
+    for unique_id, (shard_path, file, digest) in sorted(sources.items()):
+        path = f"{shard_path}/cubes/{file}"
+        if not os.path.exists(path):
+            problems.append(f"Template {path} of {unique_id} is missing")
+        elif _file_digest(path) != digest:
+            problems.append(f"Template {path} of {unique_id} does not match its shard record")
+    for file, (shard_path, digest) in sorted(shared.items()):
+        path = f"{shard_path}/cubes/{file}"
+        if not os.path.exists(path) or _file_digest(path) != digest:
+            problems.append(f"Shared file {path} is missing or does not match its shard record")
+
+    if problems:
+        raise RuntimeError("Shard outputs cannot be merged:\n  " + "\n  ".join(problems))
+
+    os.makedirs(f"{schema_path}/cubes", exist_ok=True)
+    copies = list(sources.values()) + list(
+        (shard_path, file, digest) for file, (shard_path, digest) in shared.items()
+    )
+    for shard_path, file, _ in copies:
+        source = f"{shard_path}/cubes/{file}"
+        target = f"{schema_path}/cubes/{file}"
+        if os.path.abspath(source) != os.path.abspath(target):
+            shutil.copyfile(source, target)
+    return sorted(list(files) + list(shared))
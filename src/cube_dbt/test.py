@@ -1,5 +1,7 @@
 from cube_dbt.dump import dump
 
+RELATIONSHIPS = ("one_to_many", "many_to_one", "one_to_one", "many_to_many")
+
 
 class Test:
     def __init__(self, test_dict: dict) -> None:
@@ -72,12 +74,7 @@ class Test:
     def _infer_join_from_test(self):
         relationship = None
         for t in self.tags:
-            if t in [
-                "one_to_many",
-                "many_to_one",
-                "one_to_one",
-                "many_to_many",
-            ]:
+            if t in RELATIONSHIPS:
                 relationship = t
                 break
 
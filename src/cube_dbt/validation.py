@@ -0,0 +1,159 @@
+from cube_dbt.column import COLUMN_TO_DIMENSION_TYPES
+from cube_dbt.model import Model
+from cube_dbt.test import RELATIONSHIPS
+
+MULTIPLE_PRIMARY_KEYS = "multiple_primary_keys"
+UNKNOWN_COLUMN_TYPE = "unknown_column_type"
+DUPLICATE_COLUMN = "duplicate_column"
+DUPLICATE_MEASURE = "duplicate_measure"
+MALFORMED_RELATIONSHIP = "malformed_relationship"
+
+
+class ValidationIssue:
+    def __init__(self, kind: str, model_name: str, message: str) -> None:
+        self.kind = kind
+        self.model_name = model_name
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"{self.kind}: {self.message}"
+
+
+class ValidationReport:
+    """
+    Aggregated result of Dbt.validate: every problem found across all models,
+    instead of an exception on the first one.
+    """
+
+    def __init__(self) -> None:
+        self.issues = []
+        self.models_checked = 0
+        self.columns_checked = 0
+
+    def __repr__(self) -> str:
+        return self.summary()
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+    def add(self, kind: str, model_name: str, message: str) -> None:
+        self.issues.append(ValidationIssue(kind, model_name, message))
+
+    @property
+    def ok(self) -> bool:
+        return len(self.issues) == 0
+
+    def by_kind(self, kind: str) -> list[ValidationIssue]:
+        return list(issue for issue in self.issues if issue.kind == kind)
+
+    def summary(self) -> str:
+        lines = [
+            f"Checked {self.models_checked} model(s) and {self.columns_checked} column(s), "
+            f"found {len(self.issues)} issue(s)"
+        ]
+        lines.extend(f"  {issue}" for issue in self.issues)
+        return "\n".join(lines)
+
+
+def _validate_columns(model_name: str, columns: dict, report: ValidationReport) -> set:
+    # Columns are keyed by name in the manifest, so duplicates only differ in
+    # case, which warehouses treat as the same column
+    names = set()
+    primary_keys = []
+    for column in columns.values():
+        name = column["name"]
+        if name.lower() in names:
+            report.add(
+                DUPLICATE_COLUMN,
+                model_name,
+                f"Duplicate column in {model_name}: {name}",
+            )
+        names.add(name.lower())
+
+        data_type = column.get("data_type")
+        if data_type is not None and data_type not in COLUMN_TO_DIMENSION_TYPES:
+            report.add(
+                UNKNOWN_COLUMN_TYPE,
+                model_name,
+                f"Unknown column type of {model_name}.{name}: {data_type}",
+            )
+
+        if "primary_key" in column.get("tags", ()):
+            primary_keys.append(name)
+
+    if len(primary_keys) > 1:
+        report.add(
+            MULTIPLE_PRIMARY_KEYS,
+            model_name,
+            f"More than one primary key column found in {model_name}: {', '.join(primary_keys)}",
+        )
+
+    report.columns_checked += len(columns)
+    return names
+
+
+def _validate_measures(
+    model_name: str, measures: list, column_names: set, report: ValidationReport
+) -> None:
+    names = set()
+    for measure in measures:
+        name = measure.get("name")
+        key = name.lower() if isinstance(name, str) else name
+        if key in names:
+            report.add(
+                DUPLICATE_MEASURE,
+                model_name,
+                f"Duplicate measure in {model_name}: {name}",
+            )
+        elif key in column_names:
+            report.add(
+                DUPLICATE_MEASURE,
+                model_name,
+                f"Measure in {model_name} has the same name as a column: {name}",
+            )
+        names.add(key)
+
+
+def _validate_tests(model_name: str, tests: list, report: ValidationReport) -> None:
+    for test in tests:
+        test_dict = test._test_dict
+        relationship = next(
+            (tag for tag in test_dict.get("tags", ()) if tag in RELATIONSHIPS), None
+        )
+        if relationship is None:
+            continue
+
+        kwargs = test_dict.get("test_metadata", {}).get("kwargs", {})
+        missing = list(key for key in ("column_name", "field") if not kwargs.get(key))
+        if not test_dict.get("refs"):
+            missing.append("refs")
+        if missing:
+            report.add(
+                MALFORMED_RELATIONSHIP,
+                model_name,
+                f"Malformed {relationship} relationship test in {model_name}, missing: {', '.join(missing)}",
+            )
+
+
+def validate_models(models: list[Model]) -> ValidationReport:
+    """
+    Checks primary keys, column types, duplicate column and measure names, and
+    relationship tests of all models in one sweep over the raw node dicts,
+    without building any Column or Measure objects or rendering YAML.
+    """
+    report = ValidationReport()
+    for model in models:
+        model_dict = model._model_dict
+        model_name = model_dict["name"]
+        column_names = _validate_columns(
+            model_name, model_dict.get("columns", {}), report
+        )
+        _validate_measures(
+            model_name,
+            model_dict.get("meta", {}).get("measures", []),
+            column_names,
+            report,
+        )
+        _validate_tests(model_name, model.tests, report)
+        report.models_checked += 1
+    return report
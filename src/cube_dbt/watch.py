@@ -0,0 +1,171 @@
+import hashlib
+import os
+import time
+
+from cube_dbt.dbt import Dbt, _read_file
+from cube_dbt.generator import CubeGenerator, GenerationReport
+
+
+class ManifestWatcher:
+    """
+    Polls a manifest.json file and regenerates the cube templates of the models
+    that changed since the previous parse.
+
+    Changes are detected by mtime and size first, and confirmed by a content hash,
+    so touching the file without changing it does not trigger a regeneration.
+    No filesystem notification library is required.
+    """
+
+    def __init__(
+        self,
+        manifest_path: str,
+        schema_path: str,
+        paths: list[str] = [],
+        tags: list[str] = [],
+        names: list[str] = [],
+        select: list[str] = [],
+        encoding: str = None,
+        run_results_path: str = None,
+        catalog_path: str = None,
+        interval: float = 1.0,
+        debounce: float = 0.5,
+    ) -> None:
+        """
+        Args:
+            manifest_path (str): The path to the manifest file to watch.
+            schema_path (str): Cube schema directory, templates are written to <schema_path>/cubes.
+            paths, tags, names, select (list[str], optional): Model filter, see Dbt.filter.
+            encoding (str, optional): Encoding for the manifest.json file.
+            run_results_path (str, optional): The path to a run_results.json file, reloaded with the manifest.
+            catalog_path (str, optional): The path to a catalog.json file, reloaded with the manifest.
+            interval (float, optional): Seconds between polls.
+            debounce (float, optional): Seconds the file must stay unchanged before it is reparsed,
+                so that a manifest still being written by dbt is not read.
+        """
+        self.manifest_path = manifest_path
+        self.schema_path = schema_path
+        self.paths = paths
+        self.tags = tags
+        self.names = names
+        self.select = select
+        self.encoding = encoding
+        self.run_results_path = run_results_path
+        self.catalog_path = catalog_path
+        self.interval = interval
+        self.debounce = debounce
+        self._stat = None
+        self._digest = None
+        # Previous parsed state, updated in place with Dbt.apply_manifest
+        self._dbt = None
+
+    def _read_stat(self) -> tuple or None:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read_digest(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.manifest_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _wait_until_stable(self, stat: tuple) -> tuple or None:
+        while True:
+            time.sleep(self.debounce)
+            current = self._read_stat()
+            if current == stat:
+                return current
+            stat = current
+
+    def refresh(self, verbose: bool = False) -> GenerationReport:
+        """
+        Reparses the manifest and regenerates the templates of added or changed
+        models, removing the templates of models that are gone.
+
+        Returns:
+            GenerationReport: Generated files and per-phase timings.
+        """
+        start = time.perf_counter()
+        manifest = _read_file(self.manifest_path, self.encoding)
+        run_results = (
+            _read_file(self.run_results_path, self.encoding)
+            if self.run_results_path
+            else None
+        )
+        catalog = (
+            _read_file(self.catalog_path, self.encoding) if self.catalog_path else None
+        )
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if self._dbt is None:
+            self._dbt = Dbt(manifest, run_results, catalog).filter(
+                paths=self.paths, tags=self.tags, names=self.names, select=self.select
+            )
+            models = self._dbt.models
+            stale = []
+        else:
+            if run_results is not None:
+                self._dbt.add_run_results(run_results)
+            if catalog is not None:
+                self._dbt.add_catalog(catalog)
+            changeset = self._dbt.apply_manifest(manifest)
+            models = changeset.added + changeset.changed
+            current = set(model.name for model in self._dbt.models)
+            stale = list(
+                set(model.name for model in changeset.previous.values()) - current
+            )
+        diff_time = time.perf_counter() - start
+
+        generator = CubeGenerator(self._dbt, self.schema_path)
+        generator.remove_cubes(stale)
+        report = generator.generate_cubes(
+            incremental=True, verbose=verbose, models=models
+        )
+        report.add_timing("load", load_time)
+        report.add_timing("init", diff_time)
+        return report
+
+    def poll(self, verbose: bool = False) -> GenerationReport or None:
+        """
+        Checks the manifest once and regenerates changed models if its content changed.
+
+        Returns:
+            GenerationReport or None: The report of the regeneration, or None if nothing changed.
+        """
+        stat = self._read_stat()
+        if stat is None or stat == self._stat:
+            return None
+
+        if self._stat is not None:
+            stat = self._wait_until_stable(stat)
+            if stat is None:
+                return None
+        self._stat = stat
+
+        digest = self._read_digest()
+        if digest == self._digest:
+            return None
+        self._digest = digest
+
+        return self.refresh(verbose=verbose)
+
+    def watch(self, verbose: bool = False, iterations: int = None) -> None:
+        """
+        Polls the manifest until interrupted, printing a summary after every regeneration.
+
+        Args:
+            verbose (bool, optional): Print a line for every generated cube.
+            iterations (int, optional): Stop after this many polls instead of running forever.
+        """
+        count = 0
+        while iterations is None or count < iterations:
+            report = self.poll(verbose=verbose)
+            if report is not None:
+                print(report.summary())
+            count += 1
+            if iterations is None or count < iterations:
+                time.sleep(self.interval)
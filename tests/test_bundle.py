@@ -0,0 +1,68 @@
+import os
+import tarfile
+import zipfile
+
+from pytest import raises
+from cube_dbt import Dbt
+from cube_dbt.bundle import BundleWriter, extract, read_entry, read_index
+from cube_dbt.cli import main
+from cube_dbt.generator import CubeGenerator, CubeYaml
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestBundle:
+  def test_formats(self, tmp_path):
+    templates = {'a.yml.jinja': 'cubes:\n  - a\n', 'b.yml.jinja': 'cubes:\n  - bé\n'}
+    for extension in ('zip', 'tar', 'yml'):
+      path = str(tmp_path / f'cubes.{extension}')
+      with BundleWriter(path) as bundle:
+        for name, template in templates.items():
+          bundle.add(name, template)
+      assert read_index(path)['format'] == ('yaml' if extension == 'yml' else extension)
+      for name, template in templates.items():
+        assert read_entry(path, name) == template
+
+  def test_archives_are_readable(self, tmp_path):
+    with BundleWriter(str(tmp_path / 'cubes.zip')) as bundle:
+      bundle.add('a.yml.jinja', 'a\n')
+    with BundleWriter(str(tmp_path / 'cubes.tar')) as bundle:
+      bundle.add('a.yml.jinja', 'a\n')
+    assert zipfile.ZipFile(tmp_path / 'cubes.zip').read('a.yml.jinja') == b'a\n'
+    assert tarfile.open(tmp_path / 'cubes.tar').extractfile('a.yml.jinja').read() == b'a\n'
+
+  def test_multi_document_yaml(self, tmp_path):
+    path = tmp_path / 'cubes.yml'
+    with BundleWriter(str(path)) as bundle:
+      bundle.add('a.yml.jinja', 'a\n')
+      bundle.add('b.yml.jinja', 'b\n')
+    assert path.read_text() == '--- # a.yml.jinja\na\n--- # b.yml.jinja\nb\n'
+
+  def test_unknown_extension(self, tmp_path):
+    with raises(ValueError):
+      BundleWriter(str(tmp_path / 'cubes.rar'))
+
+class TestGenerateBundle:
+  def test_generate_cubes(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    path = str(tmp_path / 'cubes.zip')
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(workers=2, verbose=False, bundle=path)
+    assert len(report.generated) == 4
+    assert not os.path.exists(tmp_path / 'cubes')
+    assert read_entry(path, 'orders_copy.yml.jinja') == CubeYaml(dbt.model('orders_copy')).generate_template()
+    assert extract(path, str(tmp_path / 'schema'), ['orders_copy.yml.jinja']) == ['orders_copy.yml.jinja']
+    assert os.listdir(tmp_path / 'schema' / 'cubes') == ['orders_copy.yml.jinja']
+
+  def test_incremental_is_not_supported(self, tmp_path):
+    generator = CubeGenerator(Dbt.from_file(manifest_path), str(tmp_path))
+    with raises(ValueError):
+      generator.generate_cubes(incremental=True, bundle=str(tmp_path / 'cubes.tar'))
+
+  def test_cli(self, tmp_path, capsys):
+    path = str(tmp_path / 'cubes.tar')
+    assert main(['generate', manifest_path, '--bundle', path]) == 0
+    assert sorted(read_index(path)['entries']) == [
+      'line_items_copy.yml.jinja',
+      'orders_copy.yml.jinja',
+      'products_copy.yml.jinja',
+      'users_copy.yml.jinja'
+    ]
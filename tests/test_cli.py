@@ -0,0 +1,23 @@
+import os
+
+from cube_dbt.cli import main
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestCli:
+  def test_generate(self, tmp_path, capsys):
+    exit_code = main(['generate', manifest_path, '--output', str(tmp_path), '--tag', 'cube'])
+    assert exit_code == 0
+    assert sorted(os.listdir(tmp_path / 'cubes')) == [
+      'orders_copy.yml.jinja',
+      'products_copy.yml.jinja'
+    ]
+    output = capsys.readouterr().out
+    assert output.startswith('Generated 2 cube(s), 0 unchanged')
+    assert 'Generated cube YAML for' not in output
+
+  def test_generate_incremental(self, tmp_path, capsys):
+    main(['generate', manifest_path, '-o', str(tmp_path), '-j', '2'])
+    capsys.readouterr()
+    main(['generate', manifest_path, '-o', str(tmp_path), '--incremental'])
+    assert capsys.readouterr().out.startswith('Generated 0 cube(s), 4 unchanged')
@@ -1,5 +1,6 @@
 from pytest import raises
 from cube_dbt import Column
+from cube_dbt.column import warehouse_dimension_type
 
 class TestColumn:
   def test_no_type(self):
@@ -42,6 +43,25 @@ class TestColumn:
     column = Column('model', column_dict)
     assert column.type == 'number'
 
+  def test_catalog_type(self):
+    """
+    If no type, then use the warehouse type from catalog.json
+    """
+    column_dict = {
+      'data_type': None
+    }
+    column = Column('model', column_dict, {'name': 'AMOUNT', 'type': 'NUMBER(38,2)'})
+    assert column.type == 'number'
+    column = Column('model', {'data_type': 'string'}, {'name': 'AMOUNT', 'type': 'NUMBER(38,2)'})
+    assert column.type == 'string'
+
+  def test_warehouse_dimension_type(self):
+    assert warehouse_dimension_type('TIMESTAMP_NTZ') == 'time'
+    assert warehouse_dimension_type('timestamp(6) with time zone') == 'time'
+    assert warehouse_dimension_type('INT64') == 'number'
+    assert warehouse_dimension_type('character varying(256)') == 'string'
+    assert warehouse_dimension_type('ARRAY<INT64>') == 'string'
+
   def test_as_dimension(self):
     column_dict = {
       'name': 'column',
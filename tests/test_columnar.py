@@ -0,0 +1,47 @@
+import os
+
+from cube_dbt import Dbt
+from cube_dbt.columnar import ColumnarCatalog
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestColumnarCatalog:
+  def test_build(self):
+    catalog = Dbt.from_file(manifest_path).columnar()
+    assert isinstance(catalog, ColumnarCatalog)
+    assert len(catalog) == 5
+    assert catalog.count_by_type()['unknown'] == 0
+
+  def test_select_by_type(self):
+    catalog = Dbt.from_file(manifest_path).columnar()
+    columns = catalog.columns(catalog.select(type='time'))
+    assert all(column.type == 'time' for column in columns)
+    assert list(column.name for column in columns) == ['completed_at', 'created_at']
+    assert list(model.name for model in catalog.models_of(catalog.select(name='created_at'))) == ['orders_copy']
+
+  def test_select_by_flags(self):
+    model_dict = {
+      'name': 'model',
+      'columns': {
+        'id': {'name': 'id', 'data_type': 'numeric', 'tags': ['primary_key'], 'meta': {}},
+        'geo': {'name': 'geo', 'data_type': 'uuid', 'tags': [], 'meta': {'a': 1}}
+      }
+    }
+    manifest = {
+      'nodes': {
+        'model.jaffle_shop.model': dict(model_dict, resource_type='model', config={'materialized': 'table'}, path='model.sql'),
+        'model.jaffle_shop.model_2': {
+          'name': 'model_2',
+          'resource_type': 'model',
+          'config': {'materialized': 'table'},
+          'path': 'model_2.sql',
+          'columns': {}
+        }
+      }
+    }
+    catalog = Dbt(manifest).columnar()
+    assert catalog.select(primary_key=True) == [0]
+    assert catalog.select(has_meta=True) == [1]
+    assert catalog.select(type='unknown') == [1]
+    assert catalog.select(name='missing') == []
+    assert list(model.name for model in catalog.models_without_primary_key()) == ['model_2']
@@ -0,0 +1,29 @@
+import gzip
+import io
+import os
+
+from cube_dbt import Dbt
+from cube_dbt.compression import detect, read
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestCompression:
+  def test_detect(self):
+    assert detect(b'\x1f\x8b\x08\x00') == 'gzip'
+    assert detect(b'\x28\xb5\x2f\xfd') == 'zstd'
+    assert detect(b'{"no') == None
+    assert detect(b'{"no', 'gzip') == 'gzip'
+
+  def test_read_uncompressed(self):
+    assert read(io.BytesIO(b'{"a": 1}')) == b'{"a": 1}'
+
+  def test_read_gzip(self):
+    data = b'{"a": 1}' * 100000
+    assert read(io.BytesIO(gzip.compress(data))) == data
+
+  def test_from_file_gzip(self, tmp_path):
+    path = tmp_path / 'manifest.json.gz'
+    with open(manifest_path, 'rb') as f:
+      path.write_bytes(gzip.compress(f.read()))
+    dbt = Dbt.from_file(str(path))
+    assert len(dbt.models) == 4
@@ -1,7 +1,7 @@
 import os 
 
 from pytest import raises
-from cube_dbt import Dbt
+from cube_dbt import Dbt, jsonlib
 
 class TestDbt:
   def test_from_file(self):
@@ -188,4 +188,286 @@ class TestDbt:
       }
     }
     dbt = Dbt(manifest)
-    assert dbt.model('users_copy_2').name == 'users_copy_2'
\ No newline at end of file
+    assert dbt.model('users_copy_2').name == 'users_copy_2'
+
+  def test_apply_manifest(self):
+    """
+    Unchanged models are reused, added and changed ones are rebuilt
+    """
+    def manifest(orders_checksum, created_at):
+      return {
+        'nodes': {
+          'model.jaffle_shop.users_copy': {
+            'name': 'users_copy',
+            'resource_type': 'model',
+            'config': {
+              'materialized': 'table'
+            },
+            'path': 'example/users_copy.sql',
+            'checksum': {'name': 'sha256', 'checksum': 'a'},
+            'created_at': created_at
+          },
+          'model.jaffle_shop.orders_copy': {
+            'name': 'orders_copy',
+            'resource_type': 'model',
+            'config': {
+              'materialized': 'table'
+            },
+            'path': 'example/orders_copy.sql',
+            'checksum': {'name': 'sha256', 'checksum': orders_checksum},
+            'created_at': created_at
+          }
+        }
+      }
+    old_manifest = manifest('b', 1)
+    del old_manifest['nodes']['model.jaffle_shop.orders_copy']
+    old_manifest['nodes']['model.jaffle_shop.items_copy'] = {
+      'name': 'items_copy',
+      'resource_type': 'model',
+      'config': {
+        'materialized': 'table'
+      },
+      'path': 'example/items_copy.sql'
+    }
+    dbt = Dbt(old_manifest)
+    users_copy = dbt.model('users_copy')
+
+    changeset = dbt.apply_manifest(manifest('b', 2))
+    assert [model.name for model in changeset.added] == ['orders_copy']
+    assert [model.name for model in changeset.removed] == ['items_copy']
+    assert changeset.unchanged == [users_copy]
+    assert dbt.model('users_copy') is users_copy
+
+    changeset = dbt.apply_manifest(manifest('c', 3))
+    assert [model.name for model in changeset.changed] == ['orders_copy']
+    assert changeset.added == []
+    assert changeset.removed == []
+    assert list(model.name for model in dbt.models) == ['users_copy', 'orders_copy']
+
+  def test_apply_manifest_releases_old_nodes(self):
+    """
+    Unchanged models point at the new manifest, so the old one can be freed
+    """
+    def manifest():
+      return {
+        'nodes': {
+          'model.jaffle_shop.orders': {
+            'name': 'orders',
+            'resource_type': 'model',
+            'config': {
+              'materialized': 'table'
+            },
+            'path': 'orders.sql',
+            'meta': {
+              'measures': [{'name': 'count', 'type': 'count'}]
+            },
+            'columns': {
+              'id': {'name': 'id', 'data_type': 'numeric', 'tags': ['primary_key']}
+            }
+          },
+          'model.jaffle_shop.users': {
+            'name': 'users',
+            'resource_type': 'model',
+            'config': {
+              'materialized': 'table'
+            },
+            'path': 'users.sql'
+          },
+          'test.jaffle_shop.relationships_orders': {
+            'resource_type': 'test',
+            'tags': ['many_to_one'],
+            'refs': [{'name': 'users'}],
+            'depends_on': {
+              'nodes': ['model.jaffle_shop.users', 'model.jaffle_shop.orders']
+            }
+          }
+        }
+      }
+    dbt = Dbt(manifest())
+    model = dbt.model('orders')
+    column, = model.columns
+    measure, = model.measures
+    test, = model.tests
+
+    new_manifest = manifest()
+    changeset = dbt.apply_manifest(new_manifest)
+    assert changeset.unchanged == [model, dbt.model('users')]
+    node = new_manifest['nodes']['model.jaffle_shop.orders']
+    assert model._model_dict is node
+    assert model.columns == [column]
+    assert column._column_dict is node['columns']['id']
+    assert measure._measure_dict is node['meta']['measures'][0]
+    assert test._test_dict is new_manifest['nodes']['test.jaffle_shop.relationships_orders']
+
+  def test_apply_manifest_with_reordered_columns(self):
+    """
+    Reordering columns changes the cube, so the model is rebuilt
+    """
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    model = dbt.model('orders_copy')
+    names = list(column.name for column in model.columns)
+
+    manifest = Dbt.from_file(directory_path + '/manifest.json').manifest
+    node = manifest['nodes']['model.jaffle_shop.orders_copy']
+    node['columns'] = dict(reversed(node['columns'].items()))
+    changeset = dbt.apply_manifest(manifest)
+    assert list(model.name for model in changeset.changed) == ['orders_copy']
+    assert len(changeset.unchanged) == 3
+    assert list(column.name for column in dbt.model('orders_copy').columns) == names[::-1]
+    assert list(column.name for column in model.columns) == names
+
+  def test_run_results(self):
+    """
+    Only successful run results are attached to models
+    """
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    dbt.add_run_results({
+      'results': [
+        {
+          'unique_id': 'model.jaffle_shop.users_copy',
+          'status': 'success',
+          'timing': [{'name': 'execute', 'completed_at': '2024-01-01T00:05:00Z'}]
+        },
+        {
+          'unique_id': 'model.jaffle_shop.orders_copy',
+          'status': 'error',
+          'timing': [{'name': 'execute', 'completed_at': '2024-01-01T00:05:00Z'}]
+        }
+      ]
+    })
+    assert dbt.model('users_copy').built_at == '2024-01-01T00:05:00Z'
+    assert dbt.model('orders_copy').built_at == None
+
+  def test_from_file_with_encoding(self, tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_bytes('{"nodes": {"model.shop.cafe": {"name": "café", "resource_type": "model", "config": {"materialized": "table"}, "path": "café.sql"}}}'.encode('latin-1'))
+    dbt = Dbt.from_file(str(path), encoding='latin-1')
+    assert dbt.models[0].name == 'café'
+
+  def test_schema_version(self):
+    """
+    Only changes affecting the generated cubes change the schema version
+    """
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    version = dbt.schema_version()
+    assert version == Dbt.from_file(directory_path + '/manifest.json').schema_version()
+
+    manifest = Dbt.from_file(directory_path + '/manifest.json').manifest
+    manifest['nodes']['model.jaffle_shop.orders_copy']['raw_code'] = 'select 1'
+    manifest['nodes']['model.jaffle_shop.orders_copy']['checksum']['checksum'] = 'changed'
+    manifest['macros'] = {}
+    dbt.apply_manifest(manifest)
+    assert dbt.schema_version() == version
+
+    manifest = Dbt.from_file(directory_path + '/manifest.json').manifest
+    manifest['nodes']['model.jaffle_shop.orders_copy']['columns']['status']['data_type'] = 'number'
+    dbt.apply_manifest(manifest)
+    assert dbt.schema_version() != version
+
+  def test_schema_version_with_filter(self):
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json').filter(tags=['cube'])
+    version = dbt.schema_version()
+
+    manifest = Dbt.from_file(directory_path + '/manifest.json').manifest
+    manifest['nodes']['model.jaffle_shop.users_copy']['description'] = 'Users'
+    dbt.apply_manifest(manifest)
+    assert dbt.schema_version() == version
+
+  def test_compact(self):
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    version = dbt.schema_version()
+    dimensions = dbt.model('orders_copy')._as_dimensions()
+
+    report = dbt.compact()
+    assert dbt.manifest is None
+    assert 0 < report.after_bytes < report.before_bytes
+    assert 'raw_code' not in dbt.model('orders_copy')._model_dict
+    assert dbt.model('orders_copy')._as_dimensions() == dimensions
+    assert dbt.schema_version() == version
+    assert dbt.validate().ok
+
+    with raises(RuntimeError):
+      dbt.filter(tags=['cube'])
+    assert len(dbt.models) == 4
+    assert dbt.model('orders_copy')._as_dimensions() == dimensions
+
+  def test_apply_manifest_after_compact(self):
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    dbt.compact(report=False)
+
+    manifest = Dbt.from_file(directory_path + '/manifest.json').manifest
+    manifest['nodes']['model.jaffle_shop.orders_copy']['description'] = 'Orders'
+    changeset = dbt.apply_manifest(manifest)
+    assert list(model.name for model in changeset.changed) == ['orders_copy']
+    assert len(changeset.unchanged) == 3
+    assert dbt.manifest is None
+    assert 'raw_code' not in dbt.model('orders_copy')._model_dict
+
+  def test_catalog(self):
+    manifest = {
+      'nodes': {
+        'model.jaffle_shop.orders': {
+          'name': 'orders',
+          'unique_id': 'model.jaffle_shop.orders',
+          'resource_type': 'model',
+          'config': {'materialized': 'table', 'tags': []},
+          'path': 'orders.sql',
+          'columns': {
+            'id': {'name': 'id', 'data_type': None, 'tags': [], 'meta': {}},
+            'status': {'name': 'status', 'data_type': 'string', 'tags': [], 'meta': {}},
+            'created_at': {'name': 'created_at', 'tags': [], 'meta': {}}
+          }
+        }
+      }
+    }
+    catalog = {
+      'nodes': {
+        'model.jaffle_shop.orders': {
+          'unique_id': 'model.jaffle_shop.orders',
+          'columns': {
+            'ID': {'name': 'ID', 'type': 'NUMBER(38,0)', 'index': 1},
+            'STATUS': {'name': 'STATUS', 'type': 'NUMBER(38,0)', 'index': 2},
+            'CREATED_AT': {'name': 'CREATED_AT', 'type': 'TIMESTAMP_NTZ', 'index': 3}
+          },
+          'stats': {
+            'row_count': {'id': 'row_count', 'value': 1200, 'include': True},
+            'bytes': {'id': 'bytes', 'value': 65536, 'include': True}
+          }
+        }
+      }
+    }
+    dbt = Dbt(manifest)
+    model = dbt.model('orders')
+    assert list(column.type for column in model.columns) == ['string', 'string', 'string']
+    assert model.row_count == None
+    version = dbt.schema_version()
+
+    dbt.add_catalog(catalog)
+    assert list(column.type for column in model.columns) == ['number', 'string', 'time']
+    assert model.row_count == 1200
+    assert model.bytes == 65536
+    assert dbt.schema_version() != version
+    assert dbt.columnar().count_by_type()['time'] == 1
+    assert list(column.type for column in Dbt(manifest, catalog=catalog).model('orders').columns) == ['number', 'string', 'time']
+
+  def test_to_cube_json(self):
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json')
+    cubes = jsonlib.loads(dbt.to_cube_json())['cubes']
+    assert cubes == dbt.to_cube_dicts()
+    assert list(cube['name'] for cube in cubes) == list(model.name for model in dbt.models)
+
+  def test_iter_models(self):
+    directory_path = os.path.dirname(os.path.realpath(__file__))
+    dbt = Dbt.from_file(directory_path + '/manifest.json').filter(tags=['cube'])
+    models = list(dbt.iter_models())
+    assert dbt._models is None
+    assert list(model.name for model in models) == list(model.name for model in dbt.models)
+    assert list(len(model.tests) for model in models) == list(len(model.tests) for model in dbt.models)
+    assert list(dbt.iter_models()) == dbt.models
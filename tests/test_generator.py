@@ -0,0 +1,122 @@
+import os
+import time
+
+from cube_dbt import Dbt, Model
+from cube_dbt.generator import MACROS_TEMPLATE, CubeGenerator, CubeYaml
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestCubeYaml:
+  def test_generate_template(self):
+    dbt = Dbt.from_file(manifest_path)
+    template = CubeYaml(dbt.model('orders_copy')).generate_template()
+    assert template == """{% set model = dbt_model('orders_copy') %}
+cubes:
+  - {{ model.as_cube() }}
+    refresh_key:
+      {{ model.as_refresh_key() }}
+    dimensions:
+      {{ model.as_dimensions() }}
+"""
+
+  def test_generate_template_with_pre_aggregations(self):
+    model = Model({
+      'name': 'orders',
+      'columns': {
+        'created_at': {'name': 'created_at', 'description': '', 'meta': {}, 'data_type': 'timestamp', 'tags': []}
+      },
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'}
+        ]
+      }
+    })
+    template = CubeYaml(model).generate_template()
+    assert template.endswith("""    pre_aggregations:
+      {{ model.as_pre_aggregations() }}
+""")
+
+  def test_generate_stub(self):
+    dbt = Dbt.from_file(manifest_path)
+    stub = CubeYaml(dbt.model('orders_copy')).generate_stub()
+    assert stub == """{% import 'cubes/cube_dbt.jinja' as cube_dbt %}
+{{ cube_dbt.cube('orders_copy') }}
+"""
+
+class TestCubeGenerator:
+  def test_generate_cubes(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(verbose=False)
+    assert sorted(os.listdir(tmp_path / 'cubes')) == [
+      'line_items_copy.yml.jinja',
+      'orders_copy.yml.jinja',
+      'products_copy.yml.jinja',
+      'users_copy.yml.jinja'
+    ]
+    assert len(report.generated) == 4
+    assert report.unchanged == []
+
+  def test_generate_cubes_with_workers(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(workers=4, verbose=False)
+    assert sorted(report.generated) == [
+      'line_items_copy',
+      'orders_copy',
+      'products_copy',
+      'users_copy'
+    ]
+
+  def test_generate_cubes_streams_models(self, tmp_path):
+    """
+    Models that are not loaded yet are streamed instead of being kept
+    """
+    dbt = Dbt.from_file(manifest_path)
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(workers=2, verbose=False)
+    assert len(report.generated) == 4
+    assert dbt._models is None
+
+  def test_streamed_models_are_timed_as_init(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    iter_models = dbt.iter_models
+    def slow_iter_models():
+      for model in iter_models():
+        time.sleep(0.01)
+        yield model
+    dbt.iter_models = slow_iter_models
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(verbose=False)
+    assert report.timings['init'] >= 0.04
+
+  def test_generate_cubes_incremental(self, tmp_path):
+    """
+    In incremental mode, only templates whose content changed are rewritten
+    """
+    dbt = Dbt.from_file(manifest_path)
+    generator = CubeGenerator(dbt, str(tmp_path))
+    generator.generate_cubes(verbose=False)
+    with open(tmp_path / 'cubes' / 'orders_copy.yml.jinja', 'w') as f:
+      f.write('stale')
+
+    report = generator.generate_cubes(incremental=True, verbose=False)
+    assert report.generated == ['orders_copy']
+    assert len(report.unchanged) == 3
+
+  def test_generate_cubes_with_macros(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(verbose=False, macros=True)
+    assert len(report.generated) == 4
+    assert sorted(os.listdir(tmp_path / 'cubes')) == [
+      'cube_dbt.jinja',
+      'line_items_copy.yml.jinja',
+      'orders_copy.yml.jinja',
+      'products_copy.yml.jinja',
+      'users_copy.yml.jinja'
+    ]
+    assert (tmp_path / 'cubes' / 'cube_dbt.jinja').read_text() == MACROS_TEMPLATE
+
+  def test_report_summary(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    report = CubeGenerator(dbt, str(tmp_path)).generate_cubes(verbose=False)
+    summary = report.summary()
+    assert summary.startswith('Generated 4 cube(s), 0 unchanged')
+    for phase in ['load', 'init', 'render', 'write', 'total']:
+      assert phase in summary
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+# Generous budget, so the test only catches regressions like an eager PyYAML import
+IMPORT_TIME_BUDGET_US = 50000
+
+src_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'src')
+
+def run(code, *options):
+  env = dict(os.environ, PYTHONPATH=src_path)
+  return subprocess.run([sys.executable, *options, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+class TestImport:
+  def test_heavy_modules_are_not_imported(self):
+    result = run("""
+import sys
+from cube_dbt import Dbt, Model, Column
+print(','.join(name for name in ('yaml', 'json', 'urllib.request', 'gzip') if name in sys.modules))
+""")
+    assert result.stdout.strip() == ''
+
+  def test_import_time_budget(self):
+    result = run('from cube_dbt import Dbt', '-X', 'importtime')
+    cumulative = 0
+    for line in result.stderr.splitlines():
+      if not line.startswith('import time:') or '|' not in line:
+        continue
+      _, total, name = line.split('|')
+      # Only count top-level imports, nested ones are included in their cumulative time
+      if name.startswith(' cube_dbt'):
+        cumulative += int(total)
+    assert 0 < cumulative < IMPORT_TIME_BUDGET_US
+
+  def test_lazy_attributes(self):
+    import cube_dbt
+    assert cube_dbt.Dbt.__name__ == 'Dbt'
+    assert 'Model' in dir(cube_dbt)
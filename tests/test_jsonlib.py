@@ -0,0 +1,26 @@
+from pytest import raises
+from cube_dbt import jsonlib
+
+class TestJsonlib:
+  def test_loads_bytes_with_every_backend(self):
+    for backend in jsonlib.available_backends():
+      assert jsonlib.loads('{"name": "café"}'.encode('utf-8'), backend=backend) == {'name': 'café'}
+
+  def test_default_backend(self):
+    assert jsonlib.get_backend() == jsonlib.available_backends()[0]
+
+  def test_set_backend(self):
+    try:
+      jsonlib.set_backend('json')
+      assert jsonlib.get_backend() == 'json'
+    finally:
+      jsonlib.set_backend(None)
+
+  def test_set_unknown_backend(self):
+    with raises(ValueError):
+      jsonlib.set_backend('unknown')
+
+  def test_dumps(self):
+    data = {'name': 'orders', 'tags': ['é'], 'meta': {'a': 1.5, 'b': None}}
+    for backend in jsonlib.available_backends():
+      assert jsonlib.loads(jsonlib.dumps(data, backend=backend)) == data
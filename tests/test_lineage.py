@@ -0,0 +1,82 @@
+from pytest import raises
+from cube_dbt import Dbt
+from cube_dbt.lineage import LineageGraph, select
+
+def model(name):
+  return {
+    'name': name,
+    'resource_type': 'model',
+    'config': {
+      'materialized': 'table'
+    },
+    'path': f'{name}.sql'
+  }
+
+# raw -> staging -> orders -> revenue -> dashboard exposure
+#                          -> unrelated
+manifest = {
+  'nodes': {
+    'model.shop.raw': model('raw'),
+    'model.shop.staging': model('staging'),
+    'model.shop.orders': model('orders'),
+    'model.shop.revenue': model('revenue'),
+    'model.shop.unrelated': model('unrelated')
+  },
+  'exposures': {
+    'exposure.shop.dashboard': {'name': 'dashboard'}
+  },
+  'parent_map': {
+    'model.shop.raw': [],
+    'model.shop.staging': ['model.shop.raw'],
+    'model.shop.orders': ['model.shop.staging'],
+    'model.shop.revenue': ['model.shop.orders'],
+    'model.shop.unrelated': ['model.shop.orders'],
+    'exposure.shop.dashboard': ['model.shop.revenue']
+  },
+  'child_map': {
+    'model.shop.raw': ['model.shop.staging'],
+    'model.shop.staging': ['model.shop.orders'],
+    'model.shop.orders': ['model.shop.revenue', 'model.shop.unrelated'],
+    'model.shop.revenue': ['exposure.shop.dashboard'],
+    'model.shop.unrelated': [],
+    'exposure.shop.dashboard': []
+  }
+}
+
+class TestLineage:
+  def test_walk(self):
+    graph = LineageGraph.from_manifest(manifest)
+    assert graph.walk(['model.shop.orders'], True) == {'model.shop.orders', 'model.shop.staging', 'model.shop.raw'}
+    assert graph.walk(['model.shop.orders'], True, depth=1) == {'model.shop.orders', 'model.shop.staging'}
+    assert graph.walk(['model.shop.orders'], False) == {
+      'model.shop.orders',
+      'model.shop.revenue',
+      'model.shop.unrelated',
+      'exposure.shop.dashboard'
+    }
+
+  def test_select(self):
+    assert select(manifest, ['orders']) == {'model.shop.orders'}
+    assert select(manifest, ['1+orders+1']) == {
+      'model.shop.staging',
+      'model.shop.orders',
+      'model.shop.revenue',
+      'model.shop.unrelated'
+    }
+
+  def test_invalid_selector(self):
+    with raises(ValueError):
+      select(manifest, ['+'])
+
+  def test_selector_matching_nothing(self):
+    with raises(ValueError, match='exposure:dashbaord'):
+      select(manifest, ['+exposure:dashbaord'])
+    with raises(ValueError):
+      select(manifest, ['orders', 'missing+'])
+
+  def test_filter_by_exposure(self):
+    dbt = Dbt(manifest).filter(select=['2+exposure:dashboard'])
+    assert list(model.name for model in dbt.models) == ['orders', 'revenue']
+
+    dbt = Dbt(manifest).filter(select=['+exposure:dashboard'], names=['raw', 'revenue'])
+    assert list(model.name for model in dbt.models) == ['raw', 'revenue']
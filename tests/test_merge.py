@@ -0,0 +1,94 @@
+import json
+
+from pytest import raises
+
+from cube_dbt import Dbt
+
+def core_manifest():
+  return {
+    'metadata': {'project_name': 'core'},
+    'nodes': {
+      'model.core.users': {
+        'name': 'users',
+        'package_name': 'core',
+        'resource_type': 'model',
+        'config': {'materialized': 'table'},
+        'path': 'users.sql',
+        'columns': {
+          'id': {'name': 'id', 'data_type': 'numeric', 'tags': ['primary_key']}
+        }
+      }
+    },
+    'parent_map': {'model.core.users': []},
+    'child_map': {'model.core.users': []}
+  }
+
+def sales_manifest():
+  return {
+    'metadata': {'project_name': 'sales'},
+    'nodes': {
+      # Stub of the cross-project ref to core.users
+      'model.core.users': {
+        'name': 'users',
+        'package_name': 'core',
+        'resource_type': 'model',
+        'config': {'materialized': 'table'},
+        'path': 'users.sql',
+        'columns': {}
+      },
+      'model.sales.orders': {
+        'name': 'orders',
+        'package_name': 'sales',
+        'resource_type': 'model',
+        'config': {'materialized': 'table'},
+        'path': 'orders.sql',
+        'columns': {}
+      },
+      'test.sales.relationships_orders_user_id': {
+        'resource_type': 'test',
+        'package_name': 'sales',
+        'tags': ['many_to_one'],
+        'refs': [{'name': 'users', 'package': 'core'}],
+        'depends_on': {'nodes': ['model.core.users', 'model.sales.orders']},
+        'test_metadata': {'kwargs': {'column_name': 'user_id', 'field': 'id'}}
+      }
+    },
+    'parent_map': {
+      'model.core.users': [],
+      'model.sales.orders': ['model.core.users']
+    },
+    'child_map': {
+      'model.core.users': ['model.sales.orders'],
+      'model.sales.orders': []
+    }
+  }
+
+class TestMerge:
+  def test_merge(self):
+    core = Dbt(core_manifest())
+    sales = Dbt(sales_manifest())
+    dbt = Dbt.merge(sales, core)
+
+    assert list(model.name for model in dbt.models) == ['users', 'orders']
+    # The owning project's version wins over the stub, without copying
+    assert dbt.model('users')._model_dict is core.manifest['nodes']['model.core.users']
+    assert dbt.model('users').primary_key.name == 'id'
+    assert dbt.model('orders')._as_joins() == [
+      {'name': 'users', 'sql': '{CUBE.user_id} = {users.id}', 'relationship': 'many_to_one'}
+    ]
+    assert dbt.manifest['child_map']['model.core.users'] == ['model.sales.orders']
+
+  def test_merge_after_compact(self):
+    core = Dbt(core_manifest())
+    core.compact(report=False)
+    with raises(RuntimeError):
+      Dbt.merge(Dbt(sales_manifest()), core)
+
+  def test_from_files(self, tmp_path):
+    paths = []
+    for name, manifest in (('core', core_manifest()), ('sales', sales_manifest())):
+      path = tmp_path / f'{name}.json'
+      path.write_text(json.dumps(manifest))
+      paths.append(str(path))
+    dbt = Dbt.from_files(paths).filter(select=['+orders'])
+    assert list(model.name for model in dbt.models) == ['users', 'orders']
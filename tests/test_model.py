@@ -285,4 +285,263 @@ class TestModel:
     }
 
     model = Model(model_dict)
-    assert model.as_dimensions() == ''
\ No newline at end of file
+    assert model.as_dimensions() == ''
+
+  def test_as_dimensions_with_selectors(self):
+    model_dict = {
+      'name': 'model',
+      'columns': {
+        'id': {
+          'name': 'id',
+          'description': '',
+          'meta': {},
+          'data_type': 'numeric',
+          'tags': ['primary_key']
+        },
+        'user_id': {
+          'name': 'user_id',
+          'description': '',
+          'meta': {},
+          'data_type': 'numeric',
+          'tags': []
+        },
+        'created_at': {
+          'name': 'created_at',
+          'description': '',
+          'meta': {},
+          'data_type': 'timestamp',
+          'tags': []
+        },
+        '_loaded_at': {
+          'name': '_loaded_at',
+          'description': '',
+          'meta': {},
+          'data_type': 'timestamp',
+          'tags': []
+        }
+      }
+    }
+    model = Model(model_dict)
+    names = lambda dimensions: list(dimension['name'] for dimension in dimensions)
+    assert names(model._as_dimensions(include=['*_id', 'id'])) == ['id', 'user_id']
+    assert names(model._as_dimensions(exclude=['re:_.*'], types=['time'])) == ['created_at']
+    assert names(model._as_dimensions(skip=['id'], types=['number'])) == ['user_id']
+    assert names(model._as_dimensions(tags=['primary_key'])) == ['id']
+
+  def test_as_measures_with_selectors(self):
+    model_dict = {
+      'name': 'model',
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'},
+          {'name': 'total_amount', 'type': 'sum', 'sql': 'amount'},
+          {'name': 'avg_amount', 'type': 'avg', 'sql': 'amount'}
+        ]
+      }
+    }
+    model = Model(model_dict)
+    names = lambda measures: list(measure['name'] for measure in measures)
+    assert names(model._as_measures(include=['*_amount'], skip=['avg_amount'])) == ['total_amount']
+    assert names(model._as_measures(types=['count'])) == ['count']
+
+  def test_as_pre_aggregations_by_convention(self):
+    """
+    A model with measures and a time column gets a rollup of all measures
+    by that column, partitioned like the model
+    """
+    model_dict = {
+      'name': 'model',
+      'config': {
+        'materialized': 'incremental',
+        'partition_by': {
+          'field': 'created_at',
+          'data_type': 'timestamp',
+          'granularity': 'month'
+        }
+      },
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'}
+        ]
+      },
+      'columns': {
+        'updated_at': {'name': 'updated_at', 'data_type': 'timestamp', 'tags': []},
+        'created_at': {'name': 'created_at', 'data_type': 'timestamp', 'tags': []}
+      }
+    }
+    model = Model(model_dict)
+    assert model._as_pre_aggregations() == [
+      {
+        'name': 'rollup',
+        'type': 'rollup',
+        'measures': ['CUBE.count'],
+        'time_dimension': 'CUBE.created_at',
+        'granularity': 'day',
+        'partition_granularity': 'month'
+      }
+    ]
+
+  def test_sections(self):
+    """
+    Sections rendered by the shared macro template are decided once per model
+    """
+    model_dict = {
+      'name': 'model',
+      'config': {'materialized': 'view'},
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'}
+        ]
+      },
+      'columns': {
+        'id': {'name': 'id', 'data_type': 'numeric', 'tags': []}
+      }
+    }
+    model = Model(model_dict)
+    assert model.has_refresh_key()
+    assert model.has_dimensions()
+    assert not model.has_joins()
+    assert model.has_measures()
+    assert not model.has_pre_aggregations()
+
+  def test_to_cube_dict(self):
+    model_dict = {
+      'name': 'model',
+      'description': '',
+      'relation_name': '"db"."schema"."table"',
+      'config': {'materialized': 'ephemeral'},
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'}
+        ]
+      },
+      'columns': {
+        'id': {'name': 'id', 'description': '', 'data_type': 'numeric', 'tags': ['primary_key'], 'meta': {'format': 'id'}}
+      }
+    }
+    model = Model(model_dict)
+    cube = model.to_cube_dict()
+    assert cube == {
+      'name': 'model',
+      'sql_table': '"db"."schema"."table"',
+      'dimensions': [
+        {'name': 'id', 'sql': 'id', 'type': 'number', 'primary_key': True, 'meta': {'format': 'id'}}
+      ],
+      'measures': [
+        {'name': 'count', 'type': 'count'}
+      ]
+    }
+    assert cube['dimensions'][0]['meta'] is model_dict['columns']['id']['meta']
+
+  def test_as_pre_aggregation_of_other_type(self):
+    """
+    Pre-aggregations other than rollups keep all their keys
+    """
+    model = Model({'name': 'model', 'meta': {}, 'columns': {}})
+    assert model._as_pre_aggregation({
+      'name': 'main',
+      'type': 'original_sql',
+      'time_dimension': 'created_at',
+      'partition_granularity': 'month'
+    }) == {
+      'name': 'main',
+      'type': 'original_sql',
+      'time_dimension': 'created_at',
+      'partition_granularity': 'month'
+    }
+
+  def test_as_pre_aggregations_without_time_column(self):
+    model_dict = {
+      'name': 'model',
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'}
+        ]
+      },
+      'columns': {
+        'id': {'name': 'id', 'data_type': 'numeric', 'tags': []}
+      }
+    }
+    model = Model(model_dict)
+    assert model._as_pre_aggregations() == []
+    assert model.as_pre_aggregations() == ''
+
+  def test_as_pre_aggregations_from_meta(self):
+    model_dict = {
+      'name': 'model',
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'},
+          {'name': 'total', 'type': 'sum', 'sql': 'amount'}
+        ],
+        'pre_aggregations': [
+          {
+            'name': 'by_status',
+            'measures': ['count'],
+            'dimensions': ['status', 'users.country'],
+            'granularity': 'week',
+            'refresh_key': {'every': '1 hour'}
+          }
+        ]
+      },
+      'columns': {
+        'status': {'name': 'status', 'data_type': 'string', 'tags': []},
+        'created_at': {'name': 'created_at', 'data_type': 'date', 'tags': []}
+      }
+    }
+    model = Model(model_dict)
+    assert model.as_pre_aggregations() == """- name: by_status
+        type: rollup
+        measures:
+        - CUBE.count
+        dimensions:
+        - CUBE.status
+        - users.country
+        time_dimension: CUBE.created_at
+        granularity: week
+        refresh_key:
+          every: 1 hour
+      """
+
+  def test_as_refresh_key_by_materialization(self):
+    model_dict = {
+      'relation_name': '"db"."schema"."table"',
+      'name': 'table',
+      'config': {
+        'materialized': 'view'
+      }
+    }
+    assert Model(model_dict)._as_refresh_key() == {'every': '1 hour'}
+
+    # No query scanning the table on every refresh check without run results
+    model_dict['config'] = {'materialized': 'table'}
+    assert Model(model_dict).as_refresh_key() == ''
+
+    model_dict['config'] = {
+      'materialized': 'incremental',
+      'partition_by': {'field': 'created_at'}
+    }
+    assert Model(model_dict).as_refresh_key() == ''
+
+    model_dict['config'] = {'materialized': 'ephemeral'}
+    assert Model(model_dict).as_refresh_key() == ''
+
+  def test_as_refresh_key_from_run_result(self):
+    model_dict = {
+      'relation_name': '"db"."schema"."table"',
+      'name': 'table',
+      'config': {
+        'materialized': 'table'
+      }
+    }
+    model = Model(model_dict)
+    model.set_run_result({
+      'status': 'success',
+      'timing': [
+        {'name': 'compile', 'completed_at': '2024-01-01T00:00:00Z'},
+        {'name': 'execute', 'completed_at': '2024-01-01T00:05:00Z'}
+      ]
+    })
+    assert model.built_at == '2024-01-01T00:05:00Z'
+    assert model.as_refresh_key() == """sql: SELECT '2024-01-01T00:05:00Z'
+      """
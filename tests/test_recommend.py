@@ -0,0 +1,133 @@
+import gzip
+import json
+
+from cube_dbt import Dbt
+from cube_dbt.cli import main
+from cube_dbt.recommend import QueryLogAnalyzer
+
+manifest = {
+  'nodes': {
+    'model.jaffle_shop.orders': {
+      'name': 'orders',
+      'resource_type': 'model',
+      'relation_name': '"db"."schema"."orders"',
+      'config': {'materialized': 'table', 'tags': []},
+      'path': 'orders.sql',
+      'meta': {
+        'measures': [
+          {'name': 'count', 'type': 'count'},
+          {'name': 'total', 'type': 'sum', 'sql': 'amount'}
+        ]
+      },
+      'columns': {
+        'status': {'name': 'status', 'data_type': 'string', 'tags': []},
+        'created_at': {'name': 'created_at', 'data_type': 'timestamp', 'tags': []}
+      }
+    }
+  }
+}
+
+def query(measures, dimensions=[], time_dimension=None, granularity=None, filters=[]):
+  query = {'measures': measures, 'dimensions': dimensions, 'filters': filters}
+  if time_dimension is not None:
+    query['timeDimensions'] = [{'dimension': time_dimension, 'granularity': granularity}]
+  return query
+
+def write_log(path, entries, compress=False):
+  data = ''.join(json.dumps(entry) + '\n' for entry in entries).encode('utf-8')
+  path.write_bytes(gzip.compress(data) if compress else data)
+  return str(path)
+
+class TestQueryLogAnalyzer:
+  def test_patterns(self):
+    analyzer = QueryLogAnalyzer(Dbt(manifest))
+    analyzer.add_query(query(['orders.count'], ['orders.status']), 100)
+    analyzer.add_query(query(['orders.count'], ['orders.status']), 300)
+    analyzer.add_query(query(['orders.total'], time_dimension='orders.created_at', granularity='month'), 50)
+    analyzer.add_query(query(['orders.count', 'users.count'], ['orders.missing']))
+    patterns = analyzer.top()
+    assert len(patterns) == 3
+    assert patterns[0].count == 2
+    assert patterns[0].average_duration == 200
+    assert patterns[0].max_duration == 300
+    assert list(measure.name for measure in patterns[0].measures) == ['count']
+    assert list(column.name for column in patterns[0].dimensions) == ['status']
+    assert patterns[1].time_dimension.name == 'created_at'
+    assert analyzer.unmapped_members == 2
+
+  def test_filters_are_dimensions(self):
+    analyzer = QueryLogAnalyzer(Dbt(manifest))
+    analyzer.add_query(query(['orders.count'], filters=[{'member': 'orders.status', 'operator': 'equals', 'values': ['paid']}]))
+    assert analyzer.top()[0].dimension_names == ('status',)
+
+  def test_bounded_patterns(self):
+    analyzer = QueryLogAnalyzer(Dbt(manifest), max_patterns=2)
+    for _ in range(3):
+      analyzer.add_query(query(['orders.count']))
+    analyzer.add_query(query(['orders.total']))
+    analyzer.add_query(query(['orders.count'], ['orders.status']))
+    assert len(analyzer._patterns) <= 2
+    assert analyzer.top(1)[0].count == 3
+
+  def test_as_cubes(self):
+    analyzer = QueryLogAnalyzer(Dbt(manifest))
+    analyzer.add_query(query(['orders.count'], ['orders.status']), 500)
+    analyzer.add_query(query(['orders.total'], time_dimension='orders.created_at', granularity='month'), 100)
+    assert analyzer._as_cubes() == [
+      {
+        'name': 'orders',
+        'pre_aggregations': [
+          {
+            'name': 'recommended_1',
+            'type': 'rollup',
+            'measures': ['CUBE.count'],
+            'dimensions': ['CUBE.status']
+          },
+          {
+            'name': 'recommended_2',
+            'type': 'rollup',
+            'measures': ['CUBE.total'],
+            'time_dimension': 'CUBE.created_at',
+            'granularity': 'month'
+          }
+        ]
+      }
+    ]
+    assert analyzer.as_cubes().startswith('cubes:\n- name: orders\n  pre_aggregations:\n')
+
+  def test_read(self, tmp_path):
+    path = write_log(tmp_path / 'queries.jsonl.gz', [
+      {'query': query(['orders.count']), 'duration': 10},
+      query(['orders.count'])
+    ], compress=True)
+    with open(path, 'ab') as f:
+      f.write(gzip.compress(b'not json\n'))
+    analyzer = QueryLogAnalyzer(Dbt(manifest)).read(path)
+    assert analyzer.queries == 2
+    assert analyzer.skipped == 1
+    assert analyzer.top()[0].count == 2
+
+  def test_read_skips_malformed_entries(self, tmp_path):
+    path = write_log(tmp_path / 'queries.jsonl', [
+      {'query': '{bad', 'duration': 10},
+      {'query': query(['orders.count']), 'duration': 'n/a'},
+      {'query': {'measures': ['orders.count'], 'timeDimensions': [{'granularity': 'day'}]}},
+      {'query': {'measures': 'orders.count'}},
+      [1, 2],
+      {'query': query(['orders.count']), 'duration': '20'}
+    ])
+    analyzer = QueryLogAnalyzer(Dbt(manifest)).read(path)
+    assert analyzer.skipped == 5
+    assert analyzer.queries == 1
+    assert analyzer.top()[0].count == 1
+    assert analyzer.top()[0].total_duration == 20
+
+class TestRecommendCli:
+  def test_recommend(self, tmp_path, capsys):
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text(json.dumps(manifest))
+    log_path = write_log(tmp_path / 'queries.jsonl', [{'query': query(['orders.count']), 'duration': 10}])
+    assert main(['recommend', str(manifest_path), log_path, '--top', '1']) == 0
+    captured = capsys.readouterr()
+    assert "name: recommended_1" in captured.out
+    assert captured.err.startswith('Analyzed 1 queries')
@@ -0,0 +1,26 @@
+import re
+
+from cube_dbt.selector import selector
+
+class TestSelector:
+  def test_exact_names(self):
+    select = selector(exclude=['id', 'name'])
+    assert not select.matches('id')
+    assert select.matches('identifier')
+
+  def test_globs_and_regexes(self):
+    select = selector(include=['*_id', 're:amount_(usd|eur)', re.compile('created_.*')])
+    assert select.matches('user_id')
+    assert select.matches('amount_usd')
+    assert select.matches('created_at')
+    assert not select.matches('amount_usd_total')
+    assert not select.matches('id')
+
+  def test_types_and_tags(self):
+    select = selector(types=['time'], tags=['public'])
+    assert select.matches('created_at', 'time', ['public'])
+    assert not select.matches('created_at', 'string', ['public'])
+    assert not select.matches('created_at', 'time', [])
+
+  def test_compiled_once_per_signature(self):
+    assert selector(['a*'], ['b']) is selector(['a*'], ['b'])
@@ -0,0 +1,68 @@
+import os
+
+from pytest import raises
+from cube_dbt import Dbt
+from cube_dbt.cli import main
+from cube_dbt.generator import CubeGenerator
+from cube_dbt.shard import assign_shards, iter_shard_models, merge_shards, shard_models
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestShard:
+  def test_assign_shards_is_balanced(self):
+    weights = {f'model.project.model_{index}': index % 7 + 1 for index in range(100)}
+    assignment = assign_shards(weights, 4)
+    loads = [0, 0, 0, 0]
+    for unique_id, shard in assignment.items():
+      loads[shard] += weights[unique_id]
+    assert max(loads) - min(loads) <= 7
+
+  def test_assign_shards_is_deterministic(self):
+    weights = {f'model.project.model_{index}': 1 for index in range(20)}
+    reversed_weights = dict(reversed(list(weights.items())))
+    assert assign_shards(weights, 3) == assign_shards(reversed_weights, 3)
+
+  def test_generate_and_merge(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    shard_paths = [str(tmp_path / f'shard-{index}') for index in range(3)]
+    generated = []
+    for index, shard_path in enumerate(shard_paths):
+      report = CubeGenerator(dbt, shard_path).generate_cubes(verbose=False, shard_index=index, shard_count=3)
+      generated.extend(report.generated)
+    assert sorted(generated) == sorted(model.name for model in dbt.models)
+
+    files = merge_shards(dbt, shard_paths, str(tmp_path / 'merged'))
+    assert files == sorted(os.listdir(tmp_path / 'merged' / 'cubes'))
+    assert len(files) == 4
+
+  def test_iter_shard_models(self):
+    dbt = Dbt.from_file(manifest_path)
+    streamed = list(model.name for model in iter_shard_models(dbt, 1, 3))
+    assert dbt._models is None
+    assert streamed == list(model.name for model in shard_models(dbt.models, 1, 3))
+    with raises(ValueError):
+      iter_shard_models(dbt, 3, 3)
+
+  def test_merge_shared_macros(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    shard_paths = [str(tmp_path / f'shard-{index}') for index in range(2)]
+    for index, shard_path in enumerate(shard_paths):
+      CubeGenerator(dbt, shard_path).generate_cubes(verbose=False, shard_index=index, shard_count=2, macros=True)
+    files = merge_shards(dbt, shard_paths, str(tmp_path / 'merged'))
+    assert 'cube_dbt.jinja' in files
+    assert files == sorted(os.listdir(tmp_path / 'merged' / 'cubes'))
+
+  def test_merge_missing_shard(self, tmp_path):
+    dbt = Dbt.from_file(manifest_path)
+    shard_path = str(tmp_path / 'shard-0')
+    CubeGenerator(dbt, shard_path).generate_cubes(verbose=False, shard_index=0, shard_count=2)
+    with raises(RuntimeError, match='Shard 1 of 2 is missing'):
+      merge_shards(dbt, [shard_path], str(tmp_path / 'merged'))
+
+  def test_cli(self, tmp_path, capsys):
+    for index in range(2):
+      main(['generate', manifest_path, '-o', str(tmp_path / f'shard-{index}'), '--shard-index', str(index), '--shard-count', '2'])
+    capsys.readouterr()
+    exit_code = main(['merge', manifest_path, str(tmp_path / 'shard-0'), str(tmp_path / 'shard-1'), '-o', str(tmp_path / 'merged')])
+    assert exit_code == 0
+    assert capsys.readouterr().out.startswith('Merged 4 cube(s) from 2 shard output(s)')
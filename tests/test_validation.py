@@ -0,0 +1,106 @@
+import os
+
+from cube_dbt import Dbt
+from cube_dbt.cli import main
+from cube_dbt.validation import (
+  DUPLICATE_COLUMN,
+  DUPLICATE_MEASURE,
+  MALFORMED_RELATIONSHIP,
+  MULTIPLE_PRIMARY_KEYS,
+  UNKNOWN_COLUMN_TYPE
+)
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+class TestValidate:
+  def test_valid_manifest(self):
+    report = Dbt.from_file(manifest_path).validate()
+    assert report.ok
+    assert report.models_checked == 4
+
+  def test_collects_all_issues(self):
+    manifest = {
+      'nodes': {
+        'model.jaffle_shop.users': {
+          'name': 'users',
+          'resource_type': 'model',
+          'config': {
+            'materialized': 'table'
+          },
+          'path': 'users.sql',
+          'meta': {
+            'measures': [
+              {'name': 'count', 'type': 'count'},
+              {'name': 'count', 'type': 'count'},
+              {'name': 'id', 'type': 'count'}
+            ]
+          },
+          'columns': {
+            'id': {'name': 'id', 'data_type': 'numeric', 'tags': ['primary_key']},
+            'uuid': {'name': 'uuid', 'data_type': 'uuid', 'tags': ['primary_key']}
+          }
+        },
+        'model.jaffle_shop.orders': {
+          'name': 'orders',
+          'resource_type': 'model',
+          'config': {
+            'materialized': 'table'
+          },
+          'path': 'orders.sql',
+          'meta': {},
+          'columns': {
+            'user_id': {'name': 'user_id', 'data_type': 'numeric', 'tags': []}
+          }
+        },
+        'test.jaffle_shop.relationships_orders': {
+          'resource_type': 'test',
+          'tags': ['many_to_one'],
+          'refs': [{'name': 'users'}],
+          'depends_on': {
+            'nodes': ['model.jaffle_shop.users', 'model.jaffle_shop.orders']
+          },
+          'test_metadata': {
+            'kwargs': {'column_name': 'user_id'}
+          }
+        }
+      }
+    }
+    report = Dbt(manifest).validate()
+    assert not report.ok
+    assert len(report.by_kind(MULTIPLE_PRIMARY_KEYS)) == 1
+    assert len(report.by_kind(UNKNOWN_COLUMN_TYPE)) == 1
+    assert len(report.by_kind(DUPLICATE_MEASURE)) == 2
+    assert len(report.by_kind(MALFORMED_RELATIONSHIP)) == 1
+    assert report.columns_checked == 3
+
+  def test_duplicates_differ_in_case(self):
+    manifest = {
+      'nodes': {
+        'model.jaffle_shop.users': {
+          'name': 'users',
+          'resource_type': 'model',
+          'config': {
+            'materialized': 'table'
+          },
+          'path': 'users.sql',
+          'meta': {
+            'measures': [
+              {'name': 'Email', 'type': 'count'},
+              {'name': 'revenue', 'type': 'sum'},
+              {'name': 'Revenue', 'type': 'sum'}
+            ]
+          },
+          'columns': {
+            'email': {'name': 'email', 'data_type': 'string', 'tags': []},
+            'EMAIL': {'name': 'EMAIL', 'data_type': 'string', 'tags': []}
+          }
+        }
+      }
+    }
+    report = Dbt(manifest).validate()
+    assert list(issue.kind for issue in report.issues) == [DUPLICATE_COLUMN, DUPLICATE_MEASURE, DUPLICATE_MEASURE]
+    assert report.issues[-1].message == 'Duplicate measure in users: Revenue'
+
+  def test_cli(self, capsys):
+    assert main(['validate', manifest_path]) == 0
+    assert 'found 0 issue(s)' in capsys.readouterr().out
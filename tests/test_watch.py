@@ -0,0 +1,51 @@
+import json
+import os
+
+from cube_dbt.watch import ManifestWatcher
+
+manifest_path = os.path.dirname(os.path.realpath(__file__)) + '/manifest.json'
+
+def write_manifest(path, manifest):
+  with open(path, 'w') as f:
+    json.dump(manifest, f)
+
+class TestManifestWatcher:
+  def test_poll(self, tmp_path):
+    with open(manifest_path) as f:
+      manifest = json.load(f)
+    path = str(tmp_path / 'manifest.json')
+    write_manifest(path, manifest)
+
+    watcher = ManifestWatcher(path, str(tmp_path), debounce=0)
+    report = watcher.poll()
+    assert len(report.generated) == 4
+
+    # Unchanged manifest
+    assert watcher.poll() is None
+
+    # Rewritten with the same content
+    write_manifest(path, manifest)
+    os.utime(path, ns=(0, 0))
+    assert watcher.poll() is None
+
+  def test_poll_regenerates_changed_models(self, tmp_path):
+    with open(manifest_path) as f:
+      manifest = json.load(f)
+    path = str(tmp_path / 'manifest.json')
+    write_manifest(path, manifest)
+
+    watcher = ManifestWatcher(path, str(tmp_path), debounce=0)
+    watcher.poll()
+
+    manifest['nodes']['model.jaffle_shop.orders_copy']['description'] = 'Orders'
+    del manifest['nodes']['model.jaffle_shop.users_copy']
+    write_manifest(path, manifest)
+    os.utime(path, ns=(0, 0))
+
+    report = watcher.poll()
+    assert report.generated + report.unchanged == ['orders_copy']
+    assert sorted(os.listdir(tmp_path / 'cubes')) == [
+      'line_items_copy.yml.jinja',
+      'orders_copy.yml.jinja',
+      'products_copy.yml.jinja'
+    ]